@@ -0,0 +1,169 @@
+"""Custom response classes for Nova API endpoints."""
+
+import os
+from typing import Any, Optional, Tuple
+
+import anyio
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from starlette.responses import FileResponse
+from starlette.types import Receive, Scope, Send
+
+# ASGI extension that lets the server push a file descriptor straight to the
+# socket (sendfile) instead of reading chunks through userspace.
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+
+def parse_byte_range(range_header: Optional[str], file_size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range ``Range: bytes=...`` header.
+    
+    Args:
+        range_header: Raw Range header value (may be None)
+        file_size: Size of the file being served
+        
+    Returns:
+        Inclusive (start, end) byte offsets, or None to serve the whole file
+        (no header, or a form we don't handle such as multiple ranges)
+        
+    Raises:
+        ValueError: If the range cannot be satisfied
+    """
+    if not range_header:
+        return None
+    
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise ValueError("Empty suffix range")
+            return max(file_size - length, 0), file_size - 1
+        
+        start = int(first)
+        end = int(last) if last else file_size - 1
+    except ValueError:
+        raise ValueError(f"Malformed range: {range_header}")
+    
+    if start >= file_size or end < start:
+        raise ValueError(f"Unsatisfiable range: {range_header}")
+    
+    return start, min(end, file_size - 1)
+
+
+class ZeroCopyFileResponse(FileResponse):
+    """
+    FileResponse that uses the ASGI zero-copy send extension when available.
+    
+    Supports serving a single byte range as 206 Partial Content. Only the
+    requested bytes are sent: through the extension's offset/count when the
+    server advertises it, otherwise by positional reads of just that window.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        *args: Any,
+        byte_range: Optional[Tuple[int, int]] = None,
+        **kwargs: Any
+    ):
+        super().__init__(path, *args, **kwargs)
+        self.byte_range = byte_range
+        self.headers["accept-ranges"] = "bytes"
+        
+        if byte_range is not None:
+            if self.stat_result is None:
+                self.stat_result = os.stat(path)
+            start, end = byte_range
+            self.status_code = 206
+            self.headers["content-range"] = f"bytes {start}-{end}/{self.stat_result.st_size}"
+            self.headers["content-length"] = str(end - start + 1)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.stat_result is None:
+            self.stat_result = await anyio.to_thread.run_sync(os.stat, self.path)
+            self.set_stat_headers(self.stat_result)
+            self.headers["accept-ranges"] = "bytes"
+        
+        if self.byte_range is not None:
+            offset = self.byte_range[0]
+            count = self.byte_range[1] - offset + 1
+        else:
+            offset, count = 0, self.stat_result.st_size
+        
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        else:
+            fd = os.open(self.path, os.O_RDONLY)
+            try:
+                if ZEROCOPY_EXTENSION in (scope.get("extensions") or {}):
+                    await send({
+                        "type": ZEROCOPY_EXTENSION,
+                        "file": fd,
+                        "offset": offset,
+                        "count": count,
+                        "more_body": False,
+                    })
+                else:
+                    await self._send_range(send, fd, offset, count)
+            finally:
+                os.close(fd)
+        
+        if self.background is not None:
+            await self.background()
+    
+    async def _send_range(self, send: Send, fd: int, offset: int, count: int) -> None:
+        """Send ``count`` bytes from ``offset`` using positional reads."""
+        remaining = count
+        while remaining > 0:
+            chunk = await anyio.to_thread.run_sync(
+                os.pread, fd, min(self.chunk_size, remaining), offset
+            )
+            if not chunk:
+                break
+            offset += len(chunk)
+            remaining -= len(chunk)
+            await send({
+                "type": "http.response.body",
+                "body": chunk,
+                "more_body": remaining > 0,
+            })
+        
+        if remaining > 0 or count == 0:
+            # File shrank underneath us (or is empty); close the body
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def _encode_model(obj: Any) -> Any:
+    """orjson fallback encoder for pydantic models."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ModelORJSONResponse(ORJSONResponse):
+    """
+    ORJSONResponse that accepts pydantic models anywhere in the content.
+    
+    Returning this directly from an endpoint skips FastAPI's jsonable_encoder
+    pass, so large results are serialized once, by orjson.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_encode_model,
+            option=orjson.OPT_NON_STR_KEYS
+        )
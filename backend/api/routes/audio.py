@@ -1,47 +1,124 @@
 """Audio streaming endpoints."""
 
+import asyncio
+import mmap
 import os
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse, StreamingResponse
+import aiofiles.os
+from cachetools import LRUCache
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 
-from config import settings
+from api.responses import ZeroCopyFileResponse, parse_byte_range
+from utils.audio_utils import PCM_BYTES_PER_MS, get_audio_codec, map_pcm, pcm_wav_header
 
 router = APIRouter()
 
-# Reference to transcription jobs (imported from transcription module)
-from api.routes.transcription import transcription_jobs
+# ffmpeg output settings per source container: (codec args, media type, extension).
+# Compressed formats are stream-copied; WAV is cut as PCM since it has no packets to copy.
+SEGMENT_FORMATS = {
+    ".mp3": (["-c:a", "copy", "-f", "mp3"], "audio/mpeg", "mp3"),
+    ".m4a": (["-c:a", "copy", "-f", "adts"], "audio/aac", "aac"),
+    ".ogg": (["-c:a", "copy", "-f", "ogg"], "audio/ogg", "ogg"),
+    ".wav": (["-c:a", "pcm_s16le", "-f", "wav"], "audio/wav", "wav"),
+}
 
+# ADTS can only carry AAC, so other .m4a codecs (e.g. ALAC) are re-encoded
+M4A_REENCODE_FORMAT = (["-c:a", "aac", "-f", "adts"], "audio/aac", "aac")
 
-@router.get("/audio/{job_id}")
-async def stream_audio(job_id: str):
-    """
-    Stream the audio file for a transcription job.
+# Read size when streaming segment bytes out of ffmpeg
+SEGMENT_CHUNK_SIZE = 64 * 1024
+
+# Job lookup shared with the transcription module
+from api.routes.transcription import get_job
+
+
+class PCMMapCache(LRUCache):
+    """LRU of open PCM memory maps, keyed by job ID; evicted maps are closed."""
     
-    Returns the audio file for playback in the frontend.
+    def popitem(self):
+        key, pcm_map = super().popitem()
+        pcm_map.close()
+        return key, pcm_map
+
+
+# Reusing maps keeps the decoded audio in the OS page cache across requests
+pcm_maps = PCMMapCache(maxsize=64)
+
+
+async def _get_pcm_map(job_id: str, pcm_path: str) -> mmap.mmap | None:
+    """Get (or open, off the event loop) the memory map of a job's decoded PCM."""
+    pcm_map = pcm_maps.get(job_id)
+    if pcm_map is None:
+        pcm_map = await asyncio.to_thread(map_pcm, pcm_path)
+        if pcm_map is None:
+            return None
+        # Another request may have mapped it while this one waited
+        existing = pcm_maps.get(job_id)
+        if existing is not None:
+            pcm_map.close()
+            return existing
+        pcm_maps[job_id] = pcm_map
+    return pcm_map
+
+
+def release_pcm_map(job_id: str):
+    """Close a job's PCM map, if one is open; called when the job is dropped."""
+    pcm_map = pcm_maps.pop(job_id, None)
+    if pcm_map is not None:
+        pcm_map.close()
+
+
+async def _get_audio_file(job: dict) -> tuple[str, os.stat_result]:
     """
-    if job_id not in transcription_jobs:
-        raise HTTPException(status_code=404, detail="Job not found")
+    Resolve a job's audio file and its stat result.
     
-    job = transcription_jobs[job_id]
+    Uses the stat recorded at upload; only jobs without one touch the
+    filesystem, and then off the event loop.
+    """
     file_path = job.get("file_path")
+    file_stat = job.get("file_stat")
     
-    if not file_path or not os.path.exists(file_path):
+    if file_path and file_stat is None:
+        try:
+            file_stat = await aiofiles.os.stat(file_path)
+        except OSError:
+            file_stat = None
+    
+    if file_stat is None:
         raise HTTPException(status_code=404, detail="Audio file not found")
     
-    # Determine content type based on file extension
-    extension = os.path.splitext(file_path)[1].lower()
-    content_types = {
-        ".mp3": "audio/mpeg",
-        ".wav": "audio/wav",
-        ".m4a": "audio/mp4",
-        ".ogg": "audio/ogg",
-    }
-    content_type = content_types.get(extension, "audio/mpeg")
+    return file_path, file_stat
+
+
+@router.get("/audio/{job_id}")
+async def stream_audio(job_id: str, request: Request):
+    """
+    Stream the audio file for a transcription job.
+    
+    Returns the audio file for playback in the frontend. Honours single
+    byte-range requests so the player can seek without refetching the file.
+    """
+    job = get_job(job_id)
+    file_path, stat_result = await _get_audio_file(job)
+    
+    # Content-Length comes from the stored stat so the body can be handed
+    # to the server as a zero-copy send
+    try:
+        byte_range = parse_byte_range(request.headers.get("range"), stat_result.st_size)
+    except ValueError:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{stat_result.st_size}"}
+        )
     
-    return FileResponse(
+    return ZeroCopyFileResponse(
         file_path,
-        media_type=content_type,
-        filename=job.get("original_filename", f"{job_id}{extension}")
+        # Content type was resolved from the extension at upload time
+        media_type=job["content_type"],
+        filename=job["original_filename"],
+        stat_result=stat_result,
+        byte_range=byte_range
     )
 
 
@@ -56,35 +133,95 @@ async def get_audio_segment(
     
     Used for re-transcription of uncertain segments.
     """
-    if job_id not in transcription_jobs:
-        raise HTTPException(status_code=404, detail="Job not found")
+    job = get_job(job_id)
+    file_path, _ = await _get_audio_file(job)
     
-    job = transcription_jobs[job_id]
-    file_path = job.get("file_path")
+    if end_ms <= start_ms:
+        raise HTTPException(status_code=400, detail="end_ms must be greater than start_ms")
     
-    if not file_path or not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="Audio file not found")
+    # Completed jobs have a decoded PCM copy: slice it directly as WAV
+    pcm_path = job.get("pcm_path")
+    if pcm_path:
+        try:
+            pcm_map = await _get_pcm_map(job_id, pcm_path)
+        except OSError:
+            pcm_map = None
+        if pcm_map is not None:
+            pcm = pcm_map[start_ms * PCM_BYTES_PER_MS:end_ms * PCM_BYTES_PER_MS]
+            return Response(
+                content=pcm_wav_header(len(pcm)) + pcm,
+                media_type="audio/wav",
+                headers={
+                    "Content-Disposition": f"attachment; filename=segment_{start_ms}_{end_ms}.wav"
+                }
+            )
     
+    extension = os.path.splitext(file_path)[1].lower()
+    codec_args, media_type, segment_extension = SEGMENT_FORMATS.get(
+        extension,
+        SEGMENT_FORMATS[".mp3"]
+    )
+    if extension == ".m4a" and await asyncio.to_thread(get_audio_codec, file_path) != "aac":
+        codec_args, media_type, segment_extension = M4A_REENCODE_FORMAT
+    
+    # Seek on the input side and stream-copy the packets so only the
+    # requested window is read - no full decode and, for stream-copyable
+    # codecs, no re-encode
     try:
-        from pydub import AudioSegment
-        
-        # Load audio and extract segment
-        audio = AudioSegment.from_file(file_path)
-        segment = audio[start_ms:end_ms]
-        
-        # Export to bytes
-        import io
-        buffer = io.BytesIO()
-        segment.export(buffer, format="mp3")
-        buffer.seek(0)
-        
-        return StreamingResponse(
-            buffer,
-            media_type="audio/mpeg",
-            headers={
-                "Content-Disposition": f"attachment; filename=segment_{start_ms}_{end_ms}.mp3"
-            }
+        process = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-nostdin", "-v", "error",
+            "-ss", f"{start_ms / 1000:.3f}",
+            "-to", f"{end_ms / 1000:.3f}",
+            "-i", file_path,
+            "-vn", *codec_args, "pipe:1",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
         )
+        # Drain stderr alongside stdout so a chatty ffmpeg can't fill the
+        # pipe and stall while the response is streaming
+        stderr_task = asyncio.create_task(process.stderr.read())
+        first_chunk = await process.stdout.read(SEGMENT_CHUNK_SIZE)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to extract segment: {str(e)}")
+    
+    # Failures show up before any output, while we can still send a 500
+    if not first_chunk:
+        stderr = await stderr_task
+        await process.wait()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to extract segment: {stderr.decode(errors='replace').strip()}"
+        )
+    
+    return StreamingResponse(
+        _stream_process_output(process, first_chunk, stderr_task),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": (
+                f"attachment; filename=segment_{start_ms}_{end_ms}.{segment_extension}"
+            )
+        }
+    )
+
 
+async def _stream_process_output(
+    process: asyncio.subprocess.Process,
+    first_chunk: bytes,
+    stderr_task: asyncio.Task
+):
+    """Yield a subprocess's stdout as it is produced, reaping the process after."""
+    try:
+        yield first_chunk
+        while chunk := await process.stdout.read(SEGMENT_CHUNK_SIZE):
+            yield chunk
+    finally:
+        # Client went away mid-stream: don't leave ffmpeg running
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+        await process.wait()
+        # stderr hits EOF once the process exits; nothing is reported from it
+        # after streaming has started
+        await stderr_task
@@ -1,6 +1,8 @@
 """Health check endpoints."""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from config import Settings, get_settings
 
 router = APIRouter()
 
@@ -12,10 +14,8 @@ async def health_check():
 
 
 @router.get("/health/ready")
-async def readiness_check():
+async def readiness_check(settings: Settings = Depends(get_settings)):
     """Readiness check - verify all services are configured."""
-    from config import settings
-    
     services = {
         "deepgram": bool(settings.deepgram_api_key),
         "assemblyai": bool(settings.assemblyai_api_key),
@@ -1,17 +1,110 @@
 """Transcription API endpoints."""
 
+import asyncio
+import logging
+import math
 import os
+import threading
 import uuid
 from typing import Optional
+import aiofiles
+import aiofiles.os
+from cachetools import TLRUCache
 from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 from config import settings
+from api.responses import ModelORJSONResponse
+from services.post_processing import get_executor, run_post_processing
+from utils.audio_utils import AUDIO_CONTENT_TYPES, DEFAULT_AUDIO_CONTENT_TYPE, decode_to_pcm
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+logger = logging.getLogger(__name__)
 
-# In-memory job storage (would use database in production)
-transcription_jobs: dict = {}
+# Read size for streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Write buffer for uploads, so the 64 KB reads reach the disk in large blocks
+UPLOAD_BUFFER_SIZE = 1 << 20
+
+
+def _job_expiry(job_id: str, job: dict, now: float) -> float:
+    """Keep jobs while they run; expire finished jobs after the configured TTL."""
+    if job["status"] in ("completed", "failed"):
+        return now + settings.job_ttl_seconds
+    return math.inf
+
+
+def _release_job(job_id: str, job: dict):
+    """Free what a job leaves behind once its record is dropped: the PCM cache and its map."""
+    # Imported here: the audio routes import this module
+    from api.routes.audio import release_pcm_map
+    
+    release_pcm_map(job_id)
+    pcm_path = job.get("pcm_path")
+    if pcm_path:
+        try:
+            os.remove(pcm_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Could not remove PCM cache of job %s: %s", job_id, e)
+
+
+class JobCache(TLRUCache):
+    """Job table that releases a job's decoded audio when it expires or is evicted."""
+    
+    def popitem(self):
+        job_id, job = super().popitem()
+        _release_job(job_id, job)
+        return job_id, job
+    
+    def expire(self, time=None):
+        expired = super().expire(time)
+        for job_id, job in expired:
+            _release_job(job_id, job)
+        return expired
+
+
+# In-memory job storage (would use database in production).
+# Bounded LRU so the table cannot grow for the life of the process; cachetools
+# is not thread-safe and reads reorder the LRU, so all access takes the lock.
+transcription_jobs = JobCache(maxsize=settings.max_tracked_jobs, ttu=_job_expiry)
+_jobs_lock = threading.RLock()
+
+# Pipeline services shared across jobs (see get_services)
+_services: Optional[dict] = None
+_services_lock = threading.Lock()
+
+
+def _get_job_record(job_id: str) -> Optional[dict]:
+    """Look up a job record, returning None if it is unknown or expired."""
+    with _jobs_lock:
+        return transcription_jobs.get(job_id)
+
+
+def _put_job(job_id: str, job: dict):
+    """Store a job record; re-putting a job refreshes its expiry."""
+    with _jobs_lock:
+        transcription_jobs[job_id] = job
+
+
+def _update_job(job: dict, **fields):
+    """
+    Apply a checkpoint's field changes to a job record in one update.
+    
+    Readers never see a partial transition, e.g. "completed" without its result.
+    """
+    job.update(fields)
+
+
+def get_job(job_id: str) -> dict:
+    """Look up a job record or raise 404."""
+    job = _get_job_record(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
 
 class TranscriptionJobResponse(BaseModel):
@@ -56,33 +149,46 @@ async def upload_and_transcribe(
     
     os.makedirs(settings.upload_dir, exist_ok=True)
     
+    max_upload_bytes = settings.max_upload_size_mb * 1024 * 1024
+    
     try:
-        contents = await file.read()
-        
-        # Check file size
-        file_size_mb = len(contents) / (1024 * 1024)
-        if file_size_mb > settings.max_upload_size_mb:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File too large. Maximum size: {settings.max_upload_size_mb}MB"
-            )
-        
-        with open(file_path, "wb") as f:
-            f.write(contents)
+        # Stream to disk in fixed-size chunks, enforcing the size cap as we go
+        total_bytes = 0
+        async with aiofiles.open(file_path, "wb", buffering=UPLOAD_BUFFER_SIZE) as f:
+            _advise_file(f.fileno(), "POSIX_FADV_SEQUENTIAL")
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                total_bytes += len(chunk)
+                if total_bytes > max_upload_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File too large. Maximum size: {settings.max_upload_size_mb}MB"
+                    )
+                await f.write(chunk)
     except HTTPException:
+        _remove_partial_upload(file_path)
         raise
     except Exception as e:
+        _remove_partial_upload(file_path)
         raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
     
+    # Stat once now; the audio endpoints serve from this instead of
+    # re-checking the file on every request
+    file_stat = await aiofiles.os.stat(file_path)
+    
     # Initialize job status
-    transcription_jobs[job_id] = {
+    _put_job(job_id, {
         "status": "pending",
         "progress": 0.0,
         "file_path": file_path,
+        "file_stat": file_stat,
+        "content_type": AUDIO_CONTENT_TYPES.get(
+            file_extension.lower(),
+            DEFAULT_AUDIO_CONTENT_TYPE
+        ),
         "original_filename": file.filename,
         "result": None,
         "error": None,
-    }
+    })
     
     # Start transcription in background
     background_tasks.add_task(process_transcription, job_id, file_path)
@@ -94,81 +200,176 @@ async def upload_and_transcribe(
     )
 
 
+def _remove_partial_upload(file_path: str):
+    """Delete a partially written upload or PCM cache, ignoring files that never got created."""
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
+
+
+def _advise_file(fd: int, advice_name: str):
+    """Pass an access-pattern hint to the kernel where posix_fadvise exists."""
+    advice = getattr(os, advice_name, None)
+    if advice is not None:
+        os.posix_fadvise(fd, 0, 0, advice)
+
+
+def get_services() -> dict:
+    """
+    Get the shared pipeline services, constructing them on first use.
+    
+    The transcription clients hold HTTP connection pools and thread pools,
+    so they are built once per process and reused by every job.
+    """
+    global _services
+    
+    if _services is None:
+        with _services_lock:
+            if _services is None:
+                from core.orchestrator import TranscriptionOrchestrator
+                from services.transcription.deepgram import DeepgramService
+                from services.transcription.assemblyai import AssemblyAIService
+                from services.transcription.whisper import WhisperService
+                from services.transcription.local_whisper import FasterWhisperService
+                from core.llm_judge import LLMJudge
+                from utils.disk_cache import DiskCache
+                
+                if settings.whisper_backend == "local":
+                    whisper_service = FasterWhisperService(
+                        settings.local_whisper_model,
+                        device=settings.local_whisper_device,
+                        compute_type=settings.local_whisper_compute_type
+                    )
+                else:
+                    whisper_service = WhisperService(
+                        settings.openai_api_key,
+                        long_audio_threshold_ms=settings.whisper_long_audio_threshold_ms,
+                        chunk_duration_ms=settings.whisper_chunk_duration_ms,
+                        max_concurrent_chunks=settings.whisper_max_concurrent_chunks
+                    )
+                
+                transcription_cache = None
+                if settings.transcription_cache_enabled:
+                    transcription_cache = DiskCache(
+                        settings.transcription_cache_dir,
+                        settings.transcription_cache_ttl_seconds
+                    )
+                
+                orchestrator = TranscriptionOrchestrator(
+                    deepgram_service=DeepgramService(settings.deepgram_api_key),
+                    assemblyai_service=AssemblyAIService(
+                        settings.assemblyai_api_key,
+                        max_workers=settings.assemblyai_max_workers
+                    ),
+                    whisper_service=whisper_service,
+                    llm_judge=LLMJudge(
+                        settings.openai_api_key,
+                        model=settings.judge_model,
+                        escalate_model=settings.judge_escalate_model,
+                        use_cache=settings.judge_cache_enabled,
+                        cache_dir=settings.judge_cache_dir,
+                        cache_ttl_seconds=settings.judge_cache_ttl_seconds
+                    ),
+                    confidence_threshold=settings.confidence_threshold,
+                    max_concurrent_segments=settings.max_concurrent_segments,
+                    transcription_cache=transcription_cache
+                )
+                
+                _services = {
+                    "orchestrator": orchestrator,
+                }
+    
+    return _services
+
+
+async def close_services():
+    """Release the shared services' network connections, if they were built."""
+    global _services
+    
+    with _services_lock:
+        services, _services = _services, None
+    
+    if services is not None:
+        orchestrator = services["orchestrator"]
+        for service in orchestrator.services.values():
+            await service.aclose()
+        await orchestrator.llm_judge.aclose()
+
+
+async def _decode_pcm_cache(job_id: str, file_path: str, pcm_path: str) -> bool:
+    """Decode the upload to raw PCM so segment requests can slice it directly."""
+    try:
+        await asyncio.to_thread(decode_to_pcm, file_path, pcm_path)
+        return True
+    except Exception as e:
+        logger.warning("PCM cache decode failed for job %s: %s", job_id, e)
+        _remove_partial_upload(pcm_path)
+        return False
+
+
 async def process_transcription(job_id: str, file_path: str):
     """Background task to process transcription."""
-    from core.orchestrator import TranscriptionOrchestrator
-    from services.transcription.deepgram import DeepgramService
-    from services.transcription.assemblyai import AssemblyAIService
-    from services.transcription.whisper import WhisperService
-    from core.llm_judge import LLMJudge
-    from services.clinical_extractor import ClinicalExtractor
-    from services.timeline_generator import TimelineGenerator
+    job = _get_job_record(job_id)
+    if job is None:
+        return
     
     try:
-        transcription_jobs[job_id]["status"] = "processing"
-        transcription_jobs[job_id]["progress"] = 0.1
+        _update_job(job, status="processing", progress=0.1)
         
-        # Initialize services
-        deepgram_service = DeepgramService(settings.deepgram_api_key)
-        assemblyai_service = AssemblyAIService(settings.assemblyai_api_key)
-        whisper_service = WhisperService(settings.openai_api_key)
-        llm_judge = LLMJudge(settings.openai_api_key)
+        orchestrator = get_services()["orchestrator"]
         
-        # Create orchestrator
-        orchestrator = TranscriptionOrchestrator(
-            deepgram_service=deepgram_service,
-            assemblyai_service=assemblyai_service,
-            whisper_service=whisper_service,
-            llm_judge=llm_judge,
-            confidence_threshold=settings.confidence_threshold
-        )
+        # Decode once up front: the orchestrator cuts segment clips from the
+        # PCM, and the audio endpoints serve segments from it afterwards
+        pcm_path = os.path.splitext(file_path)[0] + ".pcm"
+        pcm_decoded = await _decode_pcm_cache(job_id, file_path, pcm_path)
         
-        transcription_jobs[job_id]["progress"] = 0.2
+        # Recorded now, so the file is removed with the job even if it fails
+        _update_job(job, pcm_path=pcm_path if pcm_decoded else None)
         
         # Process audio through orchestrator
         transcription_result, orchestrator_decisions = await orchestrator.process_audio(
-            file_path
+            file_path,
+            pcm_path=pcm_path if pcm_decoded else None
         )
         
-        transcription_jobs[job_id]["progress"] = 0.7
-        
-        # Extract clinical data
-        clinical_extractor = ClinicalExtractor()
-        clinical_data = clinical_extractor.extract(transcription_result)
+        _update_job(job, progress=0.7)
         
-        transcription_jobs[job_id]["progress"] = 0.85
-        
-        # Generate timeline
-        timeline_generator = TimelineGenerator()
-        timeline_data = timeline_generator.generate(
+        # Clinical extraction and the timeline are pure CPU work, so they run
+        # in a worker process
+        loop = asyncio.get_running_loop()
+        clinical_data, timeline_data = await loop.run_in_executor(
+            get_executor(),
+            run_post_processing,
             transcription_result,
-            orchestrator_decisions,
-            clinical_data
+            orchestrator_decisions
         )
         
-        transcription_jobs[job_id]["progress"] = 1.0
-        transcription_jobs[job_id]["status"] = "completed"
-        transcription_jobs[job_id]["result"] = {
-            "transcription": transcription_result.model_dump(),
-            "orchestrator_decisions": [d.model_dump() for d in orchestrator_decisions],
-            "clinical_data": clinical_data.model_dump(),
-            "timeline": timeline_data.model_dump(),
-        }
+        # Keep the models as-is; they are serialized once, when the result is fetched
+        _update_job(
+            job,
+            status="completed",
+            progress=1.0,
+            result={
+                "transcription": transcription_result,
+                "orchestrator_decisions": orchestrator_decisions,
+                "clinical_data": clinical_data,
+                "timeline": timeline_data,
+            }
+        )
         
     except Exception as e:
-        transcription_jobs[job_id]["status"] = "failed"
-        transcription_jobs[job_id]["error"] = str(e)
-        import traceback
-        traceback.print_exc()
+        _update_job(job, status="failed", error=str(e))
+        logger.exception("Transcription %s failed", job_id)
+    
+    # Write back the finished job so its expiry starts counting
+    _put_job(job_id, job)
 
 
 @router.get("/transcription/{job_id}/status", response_model=TranscriptionStatusResponse)
 async def get_transcription_status(job_id: str):
     """Get the status of a transcription job."""
-    if job_id not in transcription_jobs:
-        raise HTTPException(status_code=404, detail="Job not found")
-    
-    job = transcription_jobs[job_id]
+    job = get_job(job_id)
     
     return TranscriptionStatusResponse(
         job_id=job_id,
@@ -181,10 +382,7 @@ async def get_transcription_status(job_id: str):
 @router.get("/transcription/{job_id}")
 async def get_transcription_result(job_id: str):
     """Get the full transcription result."""
-    if job_id not in transcription_jobs:
-        raise HTTPException(status_code=404, detail="Job not found")
-    
-    job = transcription_jobs[job_id]
+    job = get_job(job_id)
     
     if job["status"] == "failed":
         raise HTTPException(status_code=500, detail=job.get("error", "Transcription failed"))
@@ -195,9 +393,9 @@ async def get_transcription_result(job_id: str):
             detail=f"Transcription not yet complete. Status: {job['status']}"
         )
     
-    return {
+    return ModelORJSONResponse({
         "job_id": job_id,
         "status": "completed",
         "result": job["result"]
-    }
+    })
 
@@ -1,6 +1,8 @@
 """Configuration management for Nova backend."""
 
 import os
+from functools import lru_cache
+from typing import Optional
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
@@ -24,15 +26,51 @@ class Settings(BaseSettings):
     upload_dir: str = "./uploads"
     max_upload_size_mb: int = 100
     
+    # Job tracking
+    max_tracked_jobs: int = 10000
+    job_ttl_seconds: int = 3600
+    
     # Transcription settings
     confidence_threshold: float = 0.75
     context_window_words: int = 50
     min_segment_duration_ms: int = 500
     max_segment_duration_ms: int = 10000
+    max_concurrent_segments: int = 8
+    # Threads the AssemblyAI SDK uses to upload and poll; keep at least
+    # max_concurrent_segments so segments are not queued behind each other
+    assemblyai_max_workers: int = 8
+    
+    # Whisper backend: "openai" for the hosted API, "local" for faster-whisper
+    whisper_backend: str = "openai"
+    local_whisper_model: str = "large-v3"
+    local_whisper_device: str = "auto"
+    local_whisper_compute_type: str = "int8"
+    # OpenAI Whisper sends files longer than this as concurrent chunks
+    whisper_long_audio_threshold_ms: int = 120000
+    whisper_chunk_duration_ms: int = 60000
+    whisper_max_concurrent_chunks: int = 4
+    
+    # LLM judge models; unsure verdicts are re-judged by the escalation model
+    judge_model: str = "gpt-4o-mini"
+    judge_escalate_model: Optional[str] = "gpt-4o"
+    
+    # LLM judge verdict cache
+    judge_cache_enabled: bool = True
+    judge_cache_dir: str = "./.judge_cache"
+    judge_cache_ttl_seconds: int = 7 * 24 * 3600
+    
+    # Transcription cache, keyed by the file or segment clip audio
+    transcription_cache_enabled: bool = True
+    transcription_cache_dir: str = "./.transcription_cache"
+    transcription_cache_ttl_seconds: int = 7 * 24 * 3600
     
     # Server settings
     host: str = "0.0.0.0"
     port: int = 8000
+    # Job state lives in process memory, so a job's status and audio are only
+    # visible to the worker that accepted it; keep 1 unless requests are
+    # routed to workers by job
+    workers: int = 1
     cors_origins: list[str] = ["http://localhost:5173", "http://localhost:3000"]
     
     class Config:
@@ -40,6 +78,16 @@ class Settings(BaseSettings):
         env_file_encoding = "utf-8"
 
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the application settings, parsing the environment only once.
+    
+    Usable as a FastAPI dependency so tests can override it.
+    """
+    return Settings()
+
+
 # Global settings instance
-settings = Settings()
+settings = get_settings()
 
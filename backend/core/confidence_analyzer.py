@@ -1,8 +1,9 @@
 """Confidence analyzer for identifying uncertain transcription segments."""
 
-from typing import List
+from itertools import accumulate, chain
+from typing import List, Sequence, Tuple
 
-from models.transcription import TranscriptionResult, Word
+from models.transcription import TranscriptionResult
 from models.segment import UncertainSegment
 
 
@@ -49,31 +50,8 @@ class ConfidenceAnalyzer:
             List of UncertainSegment objects
         """
         segments = []
-        current_segment_words: List[Word] = []
-        
-        for i, word in enumerate(transcription.words):
-            if word.confidence < self.confidence_threshold:
-                # Add to current segment
-                current_segment_words.append(word)
-            else:
-                # End current segment if any
-                if current_segment_words:
-                    segment = self._create_segment(
-                        current_segment_words,
-                        transcription,
-                        i
-                    )
-                    if segment:
-                        segments.append(segment)
-                    current_segment_words = []
-        
-        # Handle segment at end of transcription
-        if current_segment_words:
-            segment = self._create_segment(
-                current_segment_words,
-                transcription,
-                len(transcription.words)
-            )
+        for start, end in self._find_low_confidence_runs(transcription.confidences):
+            segment = self._create_segment(transcription, start, end)
             if segment:
                 segments.append(segment)
         
@@ -85,37 +63,71 @@ class ConfidenceAnalyzer:
         
         return segments
     
+    def _find_low_confidence_runs(
+        self,
+        confidences: Sequence[float]
+    ) -> List[Tuple[int, int]]:
+        """
+        Find runs of consecutive words below the confidence threshold.
+        
+        Packs the below-threshold mask into bytes and jumps between run
+        edges with bytes.find, whose memchr scans a machine word at a time,
+        so long high-confidence stretches are skipped without a Python-level
+        comparison per word.
+        
+        Args:
+            confidences: Word confidences in transcript order
+            
+        Returns:
+            List of (start, end) word index pairs, end exclusive
+        """
+        mask = bytes(map(self.confidence_threshold.__gt__, confidences))
+        
+        runs = []
+        start = mask.find(1)
+        while start != -1:
+            end = mask.find(0, start)
+            if end == -1:
+                runs.append((start, len(mask)))
+                break
+            runs.append((start, end))
+            start = mask.find(1, end)
+        
+        return runs
+    
     def _create_segment(
         self,
-        words: List[Word],
         transcription: TranscriptionResult,
-        current_index: int
+        start: int,
+        end: int
     ) -> UncertainSegment | None:
         """
-        Create an UncertainSegment from a list of low-confidence words.
+        Create an UncertainSegment from a run of low-confidence words.
         
         Args:
-            words: The low-confidence words in this segment
-            transcription: Full transcription for context
-            current_index: Current position in word list
+            transcription: Full transcription for words and context
+            start: Index of the first word in the run
+            end: Index one past the last word in the run
             
         Returns:
             UncertainSegment or None if segment is too short
         """
-        if not words:
+        if end <= start:
             return None
         
         # Calculate segment boundaries
-        start_time_ms = words[0].start_time_ms
-        end_time_ms = words[-1].end_time_ms
+        start_time_ms = transcription.start_times_ms[start]
+        end_time_ms = transcription.end_times_ms[end - 1]
         
         # Check minimum duration
         duration_ms = end_time_ms - start_time_ms
         if duration_ms < self.min_segment_duration_ms:
             return None
         
+        words = transcription.words[start:end]
+        
         # Calculate average confidence
-        avg_confidence = sum(w.confidence for w in words) / len(words)
+        avg_confidence = sum(transcription.confidences[start:end]) / len(words)
         
         # Get context before and after
         context_before = transcription.get_context_before(
@@ -154,31 +166,38 @@ class ConfidenceAnalyzer:
         if not segments:
             return []
         
-        merged = [segments[0]]
+        # Group runs of segments to merge first, so each run's word list is
+        # concatenated once rather than rebuilt on every merge
+        groups = [[segments[0]]]
         
         for segment in segments[1:]:
-            last = merged[-1]
-            gap = segment.start_time_ms - last.end_time_ms
+            gap = segment.start_time_ms - groups[-1][-1].end_time_ms
             
             if gap <= gap_threshold_ms:
-                # Merge segments
-                merged_words = last.original_words + segment.original_words
-                merged_confidence = (
-                    (last.average_confidence * len(last.original_words) +
-                     segment.average_confidence * len(segment.original_words)) /
-                    len(merged_words)
-                )
-                
-                merged[-1] = UncertainSegment(
-                    start_time_ms=last.start_time_ms,
-                    end_time_ms=segment.end_time_ms,
-                    original_words=merged_words,
-                    average_confidence=merged_confidence,
-                    context_before=last.context_before,
-                    context_after=segment.context_after
-                )
+                groups[-1].append(segment)
             else:
-                merged.append(segment)
+                groups.append([segment])
+        
+        merged = []
+        
+        for group in groups:
+            if len(group) == 1:
+                merged.append(group[0])
+                continue
+            
+            merged_words = list(chain.from_iterable(s.original_words for s in group))
+            confidence_sum = sum(
+                s.average_confidence * len(s.original_words) for s in group
+            )
+            
+            merged.append(UncertainSegment(
+                start_time_ms=group[0].start_time_ms,
+                end_time_ms=group[-1].end_time_ms,
+                original_words=merged_words,
+                average_confidence=confidence_sum / len(merged_words),
+                context_before=group[0].context_before,
+                context_after=group[-1].context_after
+            ))
         
         return merged
     
@@ -202,44 +221,62 @@ class ConfidenceAnalyzer:
             
             if duration <= self.max_segment_duration_ms:
                 result.append(segment)
-            else:
-                # Split into chunks
-                words = segment.original_words
-                chunk_words: List[Word] = []
-                chunk_start_ms = words[0].start_time_ms if words else 0
-                
-                for word in words:
-                    chunk_words.append(word)
-                    chunk_duration = word.end_time_ms - chunk_start_ms
-                    
-                    if chunk_duration >= self.max_segment_duration_ms:
-                        # Create segment from chunk
-                        avg_conf = sum(w.confidence for w in chunk_words) / len(chunk_words)
-                        result.append(UncertainSegment(
-                            start_time_ms=chunk_start_ms,
-                            end_time_ms=word.end_time_ms,
-                            original_words=chunk_words.copy(),
-                            average_confidence=avg_conf,
-                            context_before=segment.context_before,
-                            context_after=segment.context_after
-                        ))
-                        chunk_words = []
-                        chunk_start_ms = word.end_time_ms
-                
-                # Add remaining words
-                if chunk_words:
-                    avg_conf = sum(w.confidence for w in chunk_words) / len(chunk_words)
-                    result.append(UncertainSegment(
-                        start_time_ms=chunk_start_ms,
-                        end_time_ms=chunk_words[-1].end_time_ms,
-                        original_words=chunk_words,
-                        average_confidence=avg_conf,
-                        context_before=segment.context_before,
-                        context_after=segment.context_after
-                    ))
+                continue
+            
+            words = segment.original_words
+            if not words:
+                continue
+            
+            # Running confidence totals give each chunk's average in O(1)
+            confidence_sums = [0.0, *accumulate(w.confidence for w in words)]
+            end_times = [w.end_time_ms for w in words]
+            
+            for start, end in self._find_split_points(words[0].start_time_ms, end_times):
+                # Chunks after the first begin where the previous chunk ended
+                chunk_start_ms = end_times[start - 1] if start else words[0].start_time_ms
+                avg_conf = (confidence_sums[end] - confidence_sums[start]) / (end - start)
+                result.append(UncertainSegment(
+                    start_time_ms=chunk_start_ms,
+                    end_time_ms=end_times[end - 1],
+                    original_words=words[start:end],
+                    average_confidence=avg_conf,
+                    context_before=segment.context_before,
+                    context_after=segment.context_after
+                ))
         
         return result
     
+    def _find_split_points(
+        self,
+        first_start_ms: int,
+        end_times: List[int]
+    ) -> List[Tuple[int, int]]:
+        """
+        Find where to cut a word run so each chunk stays under the max duration.
+        
+        Args:
+            first_start_ms: Start time of the first word
+            end_times: End time of each word in the run
+            
+        Returns:
+            List of (start, end) word index pairs, end exclusive
+        """
+        bounds = []
+        chunk_start = 0
+        chunk_start_ms = first_start_ms
+        
+        for i, end_ms in enumerate(end_times):
+            if end_ms - chunk_start_ms >= self.max_segment_duration_ms:
+                bounds.append((chunk_start, i + 1))
+                chunk_start = i + 1
+                chunk_start_ms = end_ms
+        
+        # Add remaining words
+        if chunk_start < len(end_times):
+            bounds.append((chunk_start, len(end_times)))
+        
+        return bounds
+    
     def get_statistics(
         self,
         transcription: TranscriptionResult
@@ -263,8 +300,8 @@ class ConfidenceAnalyzer:
                 "max_confidence": 0.0
             }
         
-        confidences = [w.confidence for w in transcription.words]
-        low_conf_count = sum(1 for c in confidences if c < self.confidence_threshold)
+        confidences = transcription.confidences
+        low_conf_count = sum(map(self.confidence_threshold.__gt__, confidences))
         
         return {
             "total_words": len(confidences),
@@ -1,11 +1,94 @@
 """LLM Judge for evaluating transcription candidates."""
 
-import json
-from typing import Dict, Optional
+import asyncio
+import hashlib
+import logging
+import string
+from difflib import SequenceMatcher
+from importlib import resources
+from typing import Dict, List, Optional, Tuple, Union
+import httpx
 from openai import AsyncOpenAI
+from pydantic import BaseModel, ValidationError
 
-from models.segment import UncertainSegment, OrchestratorDecision, CandidateTranscription
+from models.segment import (
+    UncertainSegment,
+    OrchestratorDecision,
+    CandidateTranscription,
+    JudgeVerdict,
+    JudgeVerdictBatch,
+)
 from models.transcription import TranscriptionResult
+from utils.disk_cache import DiskCache
+
+
+logger = logging.getLogger(__name__)
+
+# Strips punctuation when comparing candidate texts
+_PUNCTUATION_TABLE = str.maketrans("", "", string.punctuation)
+
+
+def _normalize_text(text: str) -> str:
+    """Lower-case, drop punctuation and collapse whitespace."""
+    return " ".join(text.lower().translate(_PUNCTUATION_TABLE).split())
+
+
+# Per-segment evaluation prompt; every segment renders the same text
+# around its fields, so prompts differ only where the segments do
+_PROMPT_TEMPLATE = """
+CONTEXT BEFORE (preceding words):
+"{context_before}"
+
+UNCERTAIN SEGMENT (timestamps: {start_ms}ms - {end_ms}ms):
+[This is where the transcription is uncertain]
+
+CONTEXT AFTER (following words):
+"{context_after}"
+
+TRANSCRIPTION CANDIDATES:
+
+1. DEEPGRAM (confidence: {deepgram_conf}):
+"{deepgram_text}"
+
+2. ASSEMBLYAI (confidence: {assemblyai_conf}):
+"{assemblyai_text}"
+
+3. WHISPER (confidence: {whisper_conf}):
+"{whisper_text}"
+
+Based on the context and candidates above, determine the best transcription.
+Remember: STRONGLY prefer selecting an existing transcription over synthesizing.
+
+Respond with valid JSON only.
+"""
+
+
+def _candidate_fields(
+    candidates: Dict[str, TranscriptionResult],
+    name: str
+) -> Tuple[str, Union[float, str]]:
+    """Return a candidate's (text, confidence) for the prompt, with placeholders if it failed."""
+    result = candidates.get(name)
+    if not result:
+        return "Error - no transcription", "N/A"
+    return result.full_text, result.overall_confidence
+
+
+def _load_prompt(name: str) -> str:
+    """Read a prompt shipped alongside this module, without its final newline."""
+    return resources.files(__package__).joinpath(name).read_text(encoding="utf-8").rstrip("\n")
+
+
+def _json_schema_format(model: type[BaseModel]) -> dict:
+    """Build a strict structured-output response_format from a Pydantic model."""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": model.__name__,
+            "schema": model.model_json_schema(),
+            "strict": True,
+        },
+    }
 
 
 class LLMJudge:
@@ -16,47 +99,80 @@ class LLMJudge:
     over synthesizing a new one. Synthesis is the ABSOLUTE LAST RESORT.
     """
     
-    JUDGE_SYSTEM_PROMPT = """You are an expert medical transcription reviewer. Your task is to evaluate multiple transcription candidates for an audio segment where the primary transcription model had low confidence.
-
-CRITICAL INSTRUCTION: You must STRONGLY PREFER selecting one of the provided transcriptions over creating your own. Your primary job is to CHOOSE, not to CREATE.
-
-You will be given:
-1. Context BEFORE the uncertain segment (preceding words in the conversation)
-2. Context AFTER the uncertain segment (following words in the conversation)
-3. Multiple transcription candidates from different speech-to-text models
-4. Confidence scores from each model
-
-DECISION PRIORITY (follow this order strictly):
-1. FIRST: Check if any transcription makes clear sense in context → SELECT IT
-2. SECOND: If multiple make sense, choose the one with highest confidence → SELECT IT
-3. THIRD: If transcriptions differ slightly but are similar, select the most complete one → SELECT IT
-4. FOURTH: If transcriptions differ significantly, use context to determine which fits → SELECT IT
-5. LAST RESORT ONLY: If ALL transcriptions are clearly wrong, nonsensical, or completely contradict the context in ways that cannot be explained → SYNTHESIZE your own
-
-When synthesizing (ONLY as last resort), you must:
-- Base it on the phonetic similarities between candidates
-- Ensure it fits the medical/clinical context perfectly
-- Provide detailed justification for why ALL candidates were rejected
-
-Your response must be valid JSON with this exact structure:
-{
-    "chosen_source": "deepgram" | "assemblyai" | "whisper" | "synthesized",
-    "final_text": "the selected or synthesized text",
-    "reasoning": "Brief explanation of your decision",
-    "confidence_boost": 0.85,
-    "synthesis_justification": "Only if synthesized - why ALL candidates were wrong"
-}"""
+    JUDGE_SYSTEM_PROMPT = _load_prompt("judge_system_prompt.txt")
+    
+    BATCH_INSTRUCTIONS = _load_prompt("judge_batch_instructions.txt")
+    
+    # Output token budget per judged segment. A schema-constrained verdict
+    # is well under this; the cap stops a runaway reasoning field early.
+    MAX_TOKENS_PER_SEGMENT = 220
+    
+    # Structured-output formats: the model can only emit schema-valid verdicts
+    VERDICT_FORMAT = _json_schema_format(JudgeVerdict)
+    BATCH_VERDICT_FORMAT = _json_schema_format(JudgeVerdictBatch)
+    
+    # Similarity (0-1) at which two candidate texts count as agreeing
+    AGREEMENT_RATIO = 0.95
     
-    def __init__(self, api_key: str, model: str = "gpt-4o"):
+    # Verdicts less confident than this are re-judged by the escalation model
+    ESCALATION_CONFIDENCE = 0.7
+    
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4o-mini",
+        escalate_model: Optional[str] = "gpt-4o",
+        use_cache: bool = True,
+        cache_dir: str = ".judge_cache",
+        cache_ttl_seconds: int = 7 * 24 * 3600,
+        batch_size: int = 10
+    ):
         """
         Initialize the LLM Judge.
         
         Args:
             api_key: OpenAI API key
-            model: Model to use (default: gpt-4o for best reasoning)
+            model: Model to use (default: gpt-4o-mini, fast and cheap enough
+                for choosing between three candidates)
+            escalate_model: Stronger model that re-judges low-confidence or
+                synthesized verdicts; None disables escalation
+            use_cache: Reuse verdicts for identical segments and candidates
+            cache_dir: Directory for cached verdicts
+            cache_ttl_seconds: How long a cached verdict stays valid
+            batch_size: Maximum segments judged in one request by evaluate_batch
         """
-        self.client = AsyncOpenAI(api_key=api_key)
+        # One pooled HTTP/2 client for the judge's lifetime, sized for
+        # concurrent and batched segment evaluation
+        self._http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                limits=httpx.Limits(max_connections=256, max_keepalive_connections=64),
+                retries=2
+            )
+        )
+        self.client = AsyncOpenAI(api_key=api_key, http_client=self._http_client)
         self.model = model
+        self.escalate_model = escalate_model
+        self.cache = DiskCache(cache_dir, cache_ttl_seconds) if use_cache else None
+        self.batch_size = batch_size
+        
+        # Counters for how often the agreement shortcut avoids the LLM
+        self.segments_judged = 0
+        self.agreement_shortcuts = 0
+        
+        # Verdicts handed to escalate_model for a second opinion
+        self.escalations = 0
+        
+        # Prompt tokens sent vs. served from OpenAI's prefix cache. Every
+        # request starts with the same constant system message(s) and keeps
+        # all per-segment text in the user message, so the prefix is shared.
+        self.prompt_tokens = 0
+        self.cached_prompt_tokens = 0
+    
+    async def aclose(self):
+        """Close the judge's pooled HTTP connections."""
+        await self._http_client.aclose()
     
     async def evaluate(
         self,
@@ -73,76 +189,308 @@ Your response must be valid JSON with this exact structure:
         Returns:
             OrchestratorDecision with chosen source and reasoning
         """
+        self.segments_judged += 1
+        
+        # Rules first: candidates that agree need no LLM call
+        agreement = self._agreement_decision(candidates)
+        if agreement is not None:
+            self.agreement_shortcuts += 1
+            return self._build_decision(agreement, segment, candidates)
+        
         # Format the evaluation prompt
         user_prompt = self._format_evaluation_prompt(segment, candidates)
         
+        # The prompts hold the segment times, context and every candidate's
+        # text and confidence, so together with the model they identify the verdict
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(user_prompt)
+            cached_text = await self.cache.get(cache_key)
+            if cached_text is not None:
+                return self._parse_response(cached_text, segment, candidates)
+        
         # Call the LLM
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[
+        response_text = await self._complete(
+            [
                 {"role": "system", "content": self.JUDGE_SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt}
             ],
-            temperature=0.1,  # Low temperature for consistent decisions
-            max_tokens=500,
-            response_format={"type": "json_object"}
+            max_tokens=self.MAX_TOKENS_PER_SEGMENT,
+            response_format=self.VERDICT_FORMAT
         )
         
+        if self._needs_escalation(response_text):
+            response_text = await self._escalate(user_prompt, response_text)
+        
+        # Only well-formed verdicts are cached; fallbacks get retried next time
+        if cache_key is not None and self._validate_verdict(response_text) is not None:
+            await self.cache.set(cache_key, response_text)
+        
         # Parse the response
-        return self._parse_response(
-            response.choices[0].message.content,
-            segment,
-            candidates
+        return self._parse_response(response_text, segment, candidates)
+    
+    async def evaluate_batch(
+        self,
+        items: List[Tuple[UncertainSegment, Dict[str, TranscriptionResult]]]
+    ) -> List[OrchestratorDecision]:
+        """
+        Evaluate many segments, judging up to batch_size of them per LLM call.
+        
+        Verdicts are cached per segment exactly as in evaluate, so cached
+        segments are left out of the requests.
+        
+        Args:
+            items: (segment, candidates) pairs, candidates as in evaluate
+            
+        Returns:
+            One OrchestratorDecision per item, in the same order
+        """
+        self.segments_judged += len(items)
+        
+        # Rules first: segments whose candidates agree need no LLM call
+        agreements = [self._agreement_decision(candidates) for _, candidates in items]
+        self.agreement_shortcuts += sum(agreement is not None for agreement in agreements)
+        
+        user_prompts = [
+            self._format_evaluation_prompt(segment, candidates) if agreement is None else None
+            for (segment, candidates), agreement in zip(items, agreements)
+        ]
+        response_texts: List[Optional[str]] = [None] * len(items)
+        
+        cache_keys: List[Optional[str]] = [None] * len(items)
+        if self.cache is not None:
+            to_look_up = [i for i, prompt in enumerate(user_prompts) if prompt is not None]
+            for i in to_look_up:
+                cache_keys[i] = self._cache_key(user_prompts[i])
+            cached_texts = await asyncio.gather(
+                *(self.cache.get(cache_keys[i]) for i in to_look_up)
+            )
+            for i, cached_text in zip(to_look_up, cached_texts):
+                response_texts[i] = cached_text
+        
+        pending = [
+            i for i, text in enumerate(response_texts)
+            if text is None and agreements[i] is None
+        ]
+        batches = [
+            pending[start:start + self.batch_size]
+            for start in range(0, len(pending), self.batch_size)
+        ]
+        batch_verdicts = await asyncio.gather(*(
+            self._request_verdicts([(i, user_prompts[i]) for i in batch])
+            for batch in batches
+        ))
+        
+        answered = []
+        for batch, verdicts in zip(batches, batch_verdicts):
+            for i in batch:
+                verdict = verdicts.get(i)
+                if verdict is None:
+                    # Missing from the reply; _parse_response falls back
+                    continue
+                # Stored without its id, exactly as evaluate would store it
+                response_texts[i] = verdict.model_dump_json(exclude={"id"})
+                answered.append(i)
+        
+        # Escalated segments are re-judged one per request, concurrently
+        to_escalate = [i for i in answered if self._needs_escalation(response_texts[i])]
+        escalated_texts = await asyncio.gather(*(
+            self._escalate(user_prompts[i], response_texts[i]) for i in to_escalate
+        ))
+        for i, text in zip(to_escalate, escalated_texts):
+            response_texts[i] = text
+        
+        for i in answered:
+            if cache_keys[i] is not None:
+                await self.cache.set(cache_keys[i], response_texts[i])
+        
+        return [
+            self._build_decision(agreement, segment, candidates) if agreement is not None
+            else self._parse_response(text or "", segment, candidates)
+            for text, agreement, (segment, candidates) in zip(response_texts, agreements, items)
+        ]
+    
+    async def _request_verdicts(
+        self,
+        numbered_prompts: List[Tuple[int, str]]
+    ) -> Dict[int, JudgeVerdict]:
+        """
+        Judge several segments in one chat completion.
+        
+        Args:
+            numbered_prompts: (segment id, evaluation prompt) pairs
+            
+        Returns:
+            Dict of segment id -> verdict; ids the model skipped are absent
+        """
+        user_prompt = "\n\n".join(
+            f"SEGMENT {segment_id}\n{prompt}" for segment_id, prompt in numbered_prompts
+        )
+        
+        response_text = await self._complete(
+            [
+                {"role": "system", "content": self.JUDGE_SYSTEM_PROMPT},
+                {"role": "system", "content": self.BATCH_INSTRUCTIONS},
+                {"role": "user", "content": user_prompt}
+            ],
+            max_tokens=self.MAX_TOKENS_PER_SEGMENT * len(numbered_prompts),
+            response_format=self.BATCH_VERDICT_FORMAT
         )
+        
+        try:
+            batch = JudgeVerdictBatch.model_validate_json(response_text)
+        except ValidationError:
+            # Truncated at the token cap, most likely
+            return {}
+        
+        return {verdict.id: verdict for verdict in batch.verdicts}
     
-    def _format_evaluation_prompt(
+    def _needs_escalation(self, response_text: Optional[str]) -> bool:
+        """Check whether a verdict is unsure enough to need the escalation model."""
+        if self.escalate_model is None:
+            return False
+        verdict = self._validate_verdict(response_text)
+        if verdict is None:
+            return False
+        return (
+            verdict.confidence_boost < self.ESCALATION_CONFIDENCE
+            or verdict.chosen_source == "synthesized"
+        )
+    
+    async def _escalate(self, user_prompt: str, response_text: str) -> str:
+        """
+        Re-judge a segment with the escalation model.
+        
+        Args:
+            user_prompt: The segment's evaluation prompt
+            response_text: The first model's verdict
+            
+        Returns:
+            The escalation model's verdict, or the original one if the
+            escalated reply is not a valid verdict
+        """
+        self.escalations += 1
+        escalated_text = await self._complete(
+            [
+                {"role": "system", "content": self.JUDGE_SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt}
+            ],
+            max_tokens=self.MAX_TOKENS_PER_SEGMENT,
+            response_format=self.VERDICT_FORMAT,
+            model=self.escalate_model
+        )
+        logger.info(
+            "Escalated judge verdict to %s; escalation rate %.1f%% of %d segments",
+            self.escalate_model,
+            100.0 * self.escalations / max(self.segments_judged, 1),
+            self.segments_judged
+        )
+        
+        if self._validate_verdict(escalated_text) is None:
+            return response_text
+        return escalated_text
+    
+    async def _complete(
         self,
-        segment: UncertainSegment,
-        candidates: Dict[str, TranscriptionResult]
+        messages: List[dict],
+        max_tokens: int,
+        response_format: dict,
+        model: Optional[str] = None
     ) -> str:
-        """Format the prompt for LLM evaluation."""
+        """
+        Run a structured-output chat completion, streaming the reply.
         
-        # Get candidate texts and confidences
-        deepgram_result = candidates.get("deepgram")
-        assemblyai_result = candidates.get("assemblyai")
-        whisper_result = candidates.get("whisper")
+        Tokens are consumed as they are generated rather than after the whole
+        verdict is decoded, so the client's read timeout applies between
+        chunks and a stalled generation fails fast instead of holding a
+        segment slot for the full request timeout.
         
-        deepgram_text = deepgram_result.full_text if deepgram_result else "Error - no transcription"
-        deepgram_conf = deepgram_result.overall_confidence if deepgram_result else "N/A"
+        Args:
+            messages: Chat messages to send
+            max_tokens: Output token cap
+            response_format: Structured-output format the reply must follow
+            model: Model to use instead of self.model
+            
+        Returns:
+            The reply text
+        """
+        stream = await self.client.chat.completions.create(
+            model=model or self.model,
+            messages=messages,
+            temperature=0.1,  # Low temperature for consistent decisions
+            max_tokens=max_tokens,
+            response_format=response_format,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
         
-        assemblyai_text = assemblyai_result.full_text if assemblyai_result else "Error - no transcription"
-        assemblyai_conf = assemblyai_result.overall_confidence if assemblyai_result else "N/A"
+        parts = []
+        async for chunk in stream:
+            if chunk.usage is not None:
+                # Sent as a final chunk with no choices
+                self._record_usage(chunk)
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
         
-        whisper_text = whisper_result.full_text if whisper_result else "Error - no transcription"
-        whisper_conf = whisper_result.overall_confidence if whisper_result else "N/A"
+        return "".join(parts)
+    
+    def _record_usage(self, response):
+        """Add a completion's (or usage chunk's) prompt token counts to the prefix-cache counters."""
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = (getattr(details, "cached_tokens", None) or 0) if details else 0
         
-        prompt = f"""
-CONTEXT BEFORE (preceding words):
-"{segment.context_before}"
-
-UNCERTAIN SEGMENT (timestamps: {segment.start_time_ms}ms - {segment.end_time_ms}ms):
-[This is where the transcription is uncertain]
-
-CONTEXT AFTER (following words):
-"{segment.context_after}"
-
-TRANSCRIPTION CANDIDATES:
-
-1. DEEPGRAM (confidence: {deepgram_conf}):
-"{deepgram_text}"
-
-2. ASSEMBLYAI (confidence: {assemblyai_conf}):
-"{assemblyai_text}"
-
-3. WHISPER (confidence: {whisper_conf}):
-"{whisper_text}"
-
-Based on the context and candidates above, determine the best transcription.
-Remember: STRONGLY prefer selecting an existing transcription over synthesizing.
-
-Respond with valid JSON only.
-"""
-        return prompt
+        self.prompt_tokens += usage.prompt_tokens
+        self.cached_prompt_tokens += cached
+        logger.debug(
+            "Judge prompt tokens: %d (%d cached); cumulative cache hit rate %.1f%%",
+            usage.prompt_tokens,
+            cached,
+            100.0 * self.cached_prompt_tokens / max(self.prompt_tokens, 1)
+        )
+    
+    def _cache_key(self, user_prompt: str) -> str:
+        """Hash the models and both prompts into a cache key."""
+        digest = hashlib.sha256()
+        for part in (self.model, self.escalate_model or "", self.JUDGE_SYSTEM_PROMPT, user_prompt):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+    
+    @staticmethod
+    def _validate_verdict(response_text: Optional[str]) -> Optional[JudgeVerdict]:
+        """Parse a response as a JudgeVerdict, or return None if it is not one."""
+        if not response_text:
+            return None
+        try:
+            return JudgeVerdict.model_validate_json(response_text)
+        except ValidationError:
+            return None
+    
+    def _format_evaluation_prompt(
+        self,
+        segment: UncertainSegment,
+        candidates: Dict[str, TranscriptionResult]
+    ) -> str:
+        """Format the prompt for LLM evaluation."""
+        deepgram_text, deepgram_conf = _candidate_fields(candidates, "deepgram")
+        assemblyai_text, assemblyai_conf = _candidate_fields(candidates, "assemblyai")
+        whisper_text, whisper_conf = _candidate_fields(candidates, "whisper")
+        
+        return _PROMPT_TEMPLATE.format_map({
+            "context_before": segment.context_before,
+            "context_after": segment.context_after,
+            "start_ms": segment.start_time_ms,
+            "end_ms": segment.end_time_ms,
+            "deepgram_text": deepgram_text,
+            "deepgram_conf": deepgram_conf,
+            "assemblyai_text": assemblyai_text,
+            "assemblyai_conf": assemblyai_conf,
+            "whisper_text": whisper_text,
+            "whisper_conf": whisper_conf,
+        })
     
     def _parse_response(
         self,
@@ -152,19 +500,23 @@ Respond with valid JSON only.
     ) -> OrchestratorDecision:
         """Parse LLM response into OrchestratorDecision."""
         
-        try:
-            data = json.loads(response_text)
-        except json.JSONDecodeError:
-            # Fallback: try to extract JSON from response
-            import re
-            json_match = re.search(r'\{[^{}]*\}', response_text, re.DOTALL)
-            if json_match:
-                try:
-                    data = json.loads(json_match.group())
-                except:
-                    data = self._fallback_decision(segment, candidates)
-            else:
-                data = self._fallback_decision(segment, candidates)
+        # Structured output always matches the schema unless the reply was
+        # cut off, so anything that fails validation takes the fallback
+        verdict = self._validate_verdict(response_text)
+        if verdict is not None:
+            data = verdict.model_dump()
+        else:
+            data = self._fallback_decision(segment, candidates)
+        
+        return self._build_decision(data, segment, candidates)
+    
+    def _build_decision(
+        self,
+        data: dict,
+        segment: UncertainSegment,
+        candidates: Dict[str, TranscriptionResult]
+    ) -> OrchestratorDecision:
+        """Turn verdict data into an OrchestratorDecision."""
         
         chosen_source = data.get("chosen_source", "deepgram").lower()
         final_text = data.get("final_text", segment.original_text)
@@ -199,6 +551,48 @@ Respond with valid JSON only.
             synthesis_justification=synthesis_justification
         )
     
+    def _agreement_decision(
+        self,
+        candidates: Dict[str, TranscriptionResult]
+    ) -> Optional[dict]:
+        """
+        Decide without the LLM when candidates already agree.
+        
+        If at least two candidates' normalized texts match closely, the most
+        confident of the agreeing candidates is selected.
+        
+        Returns:
+            Verdict data, or None if the candidates materially disagree
+        """
+        normalized = {
+            name: _normalize_text(result.full_text)
+            for name, result in candidates.items()
+            if result and result.full_text.strip()
+        }
+        names = list(normalized)
+        
+        agreeing = set()
+        for i, name in enumerate(names):
+            for other in names[i + 1:]:
+                matcher = SequenceMatcher(None, normalized[name], normalized[other], autojunk=False)
+                if (matcher.real_quick_ratio() >= self.AGREEMENT_RATIO
+                        and matcher.quick_ratio() >= self.AGREEMENT_RATIO
+                        and matcher.ratio() >= self.AGREEMENT_RATIO):
+                    agreeing.update((name, other))
+        
+        if not agreeing:
+            return None
+        
+        best = max(sorted(agreeing), key=lambda name: candidates[name].overall_confidence)
+        best_result = candidates[best]
+        return {
+            "chosen_source": best,
+            "final_text": best_result.full_text,
+            "reasoning": "unanimous-candidates-shortcut",
+            "confidence_boost": min(best_result.overall_confidence + 0.1, 1.0),
+            "synthesis_justification": None
+        }
+    
     def _fallback_decision(
         self,
         segment: UncertainSegment,
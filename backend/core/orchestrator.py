@@ -1,15 +1,59 @@
 """Multi-model transcription orchestrator."""
 
 import asyncio
-from typing import List, Tuple, Optional
+import hashlib
+import logging
+import mmap
+import os
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from operator import attrgetter
+from typing import Awaitable, Callable, List, Optional, Sequence, Set, Tuple
+from pydantic import ValidationError
 
 from models.transcription import TranscriptionResult, Word
 from models.segment import UncertainSegment, OrchestratorDecision
 from services.transcription.deepgram import DeepgramService
 from services.transcription.assemblyai import AssemblyAIService
-from services.transcription.whisper import WhisperService
+from services.transcription.base import BaseTranscriptionService
 from core.confidence_analyzer import ConfidenceAnalyzer
 from core.llm_judge import LLMJudge
+from utils.audio_utils import map_pcm, pcm_wav_clip, voiced_ratio
+from utils.disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+# Audio kept either side of a segment when re-transcribing it, for context
+SEGMENT_PADDING_MS = 100
+
+# Segments with less voiced audio than this (0-1) are treated as silence
+MIN_VOICED_RATIO = 0.2
+
+# Terms boosted for clinical context when the caller passes no vocabulary
+DEFAULT_MEDICAL_VOCABULARY: Tuple[str, ...] = (
+    "hypertension", "diabetes", "cholesterol", "hemoglobin",
+    "prescription", "medication", "diagnosis", "symptoms",
+    "blood pressure", "heart rate", "temperature", "oxygen",
+    "milligrams", "milliliters", "units", "dosage",
+)
+
+
+@lru_cache(maxsize=32)
+def _file_sha256_at(file_path: str, mtime_ns: int, size: int) -> str:
+    """Hash one version of a file; the stat fields make a rewrite a new key."""
+    with open(file_path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _file_sha256(file_path: str) -> str:
+    """
+    Hash a file's contents without reading it into memory at once.
+    
+    Memoized while the file is unchanged, so a job's primary pass and its
+    segment fallbacks hash the upload once.
+    """
+    stat = os.stat(file_path)
+    return _file_sha256_at(file_path, stat.st_mtime_ns, stat.st_size)
 
 
 class TranscriptionOrchestrator:
@@ -26,10 +70,12 @@ class TranscriptionOrchestrator:
         self,
         deepgram_service: DeepgramService,
         assemblyai_service: AssemblyAIService,
-        whisper_service: WhisperService,
+        whisper_service: BaseTranscriptionService,
         llm_judge: LLMJudge,
         confidence_threshold: float = 0.75,
-        context_window_words: int = 50
+        context_window_words: int = 50,
+        max_concurrent_segments: int = 8,
+        transcription_cache: Optional[DiskCache] = None
     ):
         """
         Initialize the orchestrator with transcription services.
@@ -37,10 +83,16 @@ class TranscriptionOrchestrator:
         Args:
             deepgram_service: Deepgram transcription service
             assemblyai_service: AssemblyAI transcription service
-            whisper_service: OpenAI Whisper transcription service
+            whisper_service: Whisper transcription service, either OpenAI's
+                API (WhisperService) or local (FasterWhisperService)
             llm_judge: LLM judge for evaluating candidates
             confidence_threshold: Threshold below which to trigger orchestration
             context_window_words: Number of context words for LLM
+            max_concurrent_segments: Segments re-transcribed at once, to stay
+                within the providers' rate limits
+            transcription_cache: Cache of transcriptions keyed by the audio
+                (the whole file for the primary pass, the clip for segments),
+                so re-runs on the same file skip the providers
         """
         self.services = {
             "deepgram": deepgram_service,
@@ -48,8 +100,12 @@ class TranscriptionOrchestrator:
             "whisper": whisper_service
         }
         self.llm_judge = llm_judge
+        self.transcription_cache = transcription_cache
         self.confidence_threshold = confidence_threshold
         
+        # Shared by all jobs using this orchestrator, so the bound is global
+        self._segment_semaphore = asyncio.Semaphore(max_concurrent_segments)
+        
         self.confidence_analyzer = ConfidenceAnalyzer(
             confidence_threshold=confidence_threshold,
             context_window_words=context_window_words
@@ -58,7 +114,8 @@ class TranscriptionOrchestrator:
     async def process_audio(
         self,
         audio_file_path: str,
-        medical_vocabulary: Optional[List[str]] = None
+        medical_vocabulary: Optional[Sequence[str]] = None,
+        pcm_path: Optional[str] = None
     ) -> Tuple[TranscriptionResult, List[OrchestratorDecision]]:
         """
         Main entry point for processing an audio file.
@@ -71,48 +128,53 @@ class TranscriptionOrchestrator:
         
         Args:
             audio_file_path: Path to the audio file
-            medical_vocabulary: Optional list of medical terms for boosting
+            medical_vocabulary: Optional medical terms for boosting (default:
+                DEFAULT_MEDICAL_VOCABULARY)
+            pcm_path: The file already decoded by decode_to_pcm; segment
+                clips are sliced from it instead of each service cutting
+                the source file
             
         Returns:
             Tuple of (final transcription, list of orchestrator decisions)
         """
-        # Default medical vocabulary for clinical context
         if medical_vocabulary is None:
-            medical_vocabulary = [
-                "hypertension", "diabetes", "cholesterol", "hemoglobin",
-                "prescription", "medication", "diagnosis", "symptoms",
-                "blood pressure", "heart rate", "temperature", "oxygen",
-                "milligrams", "milliliters", "units", "dosage"
-            ]
+            medical_vocabulary = DEFAULT_MEDICAL_VOCABULARY
         
         # Step 1: Primary transcription with Deepgram
-        print("Step 1: Primary transcription with Deepgram...")
-        primary_result = await self.services["deepgram"].transcribe(
-            audio_file_path,
-            vocabulary_boost=medical_vocabulary
-        )
+        logger.info("Step 1: Primary transcription with Deepgram")
+        if self.transcription_cache is not None:
+            primary_result = await self._transcribe_primary_cached(
+                audio_file_path,
+                medical_vocabulary
+            )
+        else:
+            primary_result = await self.services["deepgram"].transcribe(
+                audio_file_path,
+                vocabulary_boost=medical_vocabulary
+            )
         
         # Step 2: Identify uncertain segments
-        print("Step 2: Analyzing confidence levels...")
+        logger.info("Step 2: Analyzing confidence levels")
         uncertain_segments = self.confidence_analyzer.identify_uncertain_segments(
             primary_result
         )
         
-        print(f"Found {len(uncertain_segments)} uncertain segment(s)")
+        logger.info("Found %d uncertain segment(s)", len(uncertain_segments))
         
         if not uncertain_segments:
             # No uncertain segments, return primary result
             return primary_result, []
         
         # Step 3: Process each uncertain segment through the council
-        print("Step 3: Processing uncertain segments with multi-model orchestration...")
+        logger.info("Step 3: Processing uncertain segments with multi-model orchestration")
         decisions = await self._process_uncertain_segments(
             audio_file_path,
-            uncertain_segments
+            uncertain_segments,
+            pcm_path
         )
         
         # Step 4: Merge decisions back into final transcript
-        print("Step 4: Merging orchestrated decisions...")
+        logger.info("Step 4: Merging orchestrated decisions")
         final_result = self._merge_decisions(primary_result, decisions)
         
         return final_result, decisions
@@ -120,7 +182,8 @@ class TranscriptionOrchestrator:
     async def _process_uncertain_segments(
         self,
         audio_file_path: str,
-        segments: List[UncertainSegment]
+        segments: List[UncertainSegment],
+        pcm_path: Optional[str] = None
     ) -> List[OrchestratorDecision]:
         """
         For each uncertain segment, invoke all models and get LLM judgment.
@@ -128,38 +191,104 @@ class TranscriptionOrchestrator:
         Args:
             audio_file_path: Path to audio file
             segments: List of uncertain segments
+            pcm_path: Decoded PCM of the file, if available
             
         Returns:
             List of OrchestratorDecision for each segment
         """
-        decisions = []
+        # Map the decoded PCM so every service gets its segment clips from it;
+        # without it, each service cuts the segment from the source file
+        pcm = None
+        if pcm_path is not None:
+            try:
+                pcm = await asyncio.to_thread(map_pcm, pcm_path)
+            except OSError as e:
+                logger.warning("Could not map decoded audio, slicing per service instead: %s", e)
         
-        for i, segment in enumerate(segments):
-            print(f"  Processing segment {i+1}/{len(segments)} ({segment.start_time_ms}ms - {segment.end_time_ms}ms)...")
-            
-            # Get transcriptions from all models concurrently
-            candidate_results = await self._get_all_transcriptions(
-                audio_file_path,
-                segment
-            )
-            
-            # Get LLM judgment
-            decision = await self.llm_judge.evaluate(
-                segment=segment,
-                candidates=candidate_results
+        try:
+            return await self._judge_segments(audio_file_path, segments, pcm)
+        finally:
+            if pcm is not None:
+                pcm.close()
+    
+    async def _judge_segments(
+        self,
+        audio_file_path: str,
+        segments: List[UncertainSegment],
+        pcm: Optional[mmap.mmap]
+    ) -> List[OrchestratorDecision]:
+        """Skip silent segments, then transcribe and judge the rest."""
+        # Low confidence over silence or noise is common; those segments
+        # skip re-transcription and the judge entirely
+        if pcm is not None:
+            silent = await asyncio.to_thread(self._find_silent_segments, pcm, segments)
+        else:
+            silent = set()
+        voiced_segments = [s for i, s in enumerate(segments) if i not in silent]
+        
+        # Fetch every segment's candidates, then judge them together so the
+        # segments share LLM round trips instead of paying one each
+        candidate_results = await asyncio.gather(*(
+            self._get_candidates_bounded(audio_file_path, segment, pcm)
+            for segment in voiced_segments
+        ))
+        
+        judged = iter(await self.llm_judge.evaluate_batch(
+            list(zip(voiced_segments, candidate_results))
+        ))
+        decisions = [
+            self._silence_decision(segment) if i in silent else next(judged)
+            for i, segment in enumerate(segments)
+        ]
+        
+        for i, (segment, decision) in enumerate(zip(segments, decisions)):
+            logger.info(
+                "Segment %d/%d (%dms - %dms): chose %s: %.50s",
+                i + 1,
+                len(segments),
+                segment.start_time_ms,
+                segment.end_time_ms,
+                decision.chosen_source,
+                decision.final_text
             )
-            
-            print(f"    Chosen source: {decision.chosen_source}")
-            print(f"    Final text: {decision.final_text[:50]}..." if len(decision.final_text) > 50 else f"    Final text: {decision.final_text}")
-            
-            decisions.append(decision)
         
         return decisions
     
+    @staticmethod
+    def _find_silent_segments(pcm: mmap.mmap, segments: List[UncertainSegment]) -> Set[int]:
+        """Return the indices of segments with too little voiced audio to transcribe."""
+        return {
+            i for i, segment in enumerate(segments)
+            if voiced_ratio(pcm, segment.start_time_ms, segment.end_time_ms) < MIN_VOICED_RATIO
+        }
+    
+    @staticmethod
+    def _silence_decision(segment: UncertainSegment) -> OrchestratorDecision:
+        """Resolve a silent segment without the judge; its words are dropped."""
+        return OrchestratorDecision(
+            segment=segment,
+            chosen_source="silence",
+            final_text="",
+            reasoning="silence-skipped",
+            confidence_boost=segment.average_confidence
+        )
+    
+    async def _get_candidates_bounded(
+        self,
+        audio_file_path: str,
+        segment: UncertainSegment,
+        pcm: Optional[mmap.mmap] = None
+    ) -> dict:
+        """Get a segment's transcriptions once a concurrency slot is free."""
+        async with self._segment_semaphore:
+            return await self._get_all_transcriptions(audio_file_path, segment, pcm)
+    
     async def _get_all_transcriptions(
         self,
         audio_file_path: str,
-        segment: UncertainSegment
+        segment: UncertainSegment,
+        pcm: Optional[mmap.mmap] = None,
+        use_cache: bool = True
     ) -> dict:
         """
         Get transcriptions from all models for a segment.
@@ -168,30 +297,168 @@ class TranscriptionOrchestrator:
         Args:
             audio_file_path: Path to audio file
             segment: The uncertain segment
+            pcm: Map of the whole file's decoded PCM; when given, the segment is cut
+                from it once and the same clip is sent to every service
+            use_cache: Reuse cached transcriptions of an identical clip, or
+                of the same segment of an identical file when pcm is missing
             
         Returns:
             Dict of model_name -> TranscriptionResult
         """
+        names = list(self.services)
+        
+        if pcm is not None:
+            clip_start_ms = max(0, segment.start_time_ms - SEGMENT_PADDING_MS)
+            clip = pcm_wav_clip(pcm, clip_start_ms, segment.end_time_ms + SEGMENT_PADDING_MS)
+            if use_cache and self.transcription_cache is not None:
+                clip_hash = hashlib.sha256(clip).hexdigest()
+                calls = [
+                    self._transcribe_clip_cached(name, clip, clip_start_ms, clip_hash)
+                    for name in names
+                ]
+            else:
+                calls = [
+                    self.services[name].transcribe_segment_audio(clip, clip_start_ms)
+                    for name in names
+                ]
+        elif use_cache and self.transcription_cache is not None:
+            file_hash = await asyncio.to_thread(_file_sha256, audio_file_path)
+            calls = [
+                self._transcribe_segment_cached(name, audio_file_path, segment, file_hash)
+                for name in names
+            ]
+        else:
+            calls = [
+                self.services[name].transcribe_segment(
+                    audio_file_path,
+                    segment.start_time_ms,
+                    segment.end_time_ms
+                )
+                for name in names
+            ]
+        
+        # Gather schedules all three calls at once, so the wait is the
+        # slowest service rather than the sum of all three
+        outcomes = await asyncio.gather(*calls, return_exceptions=True)
+        
         results = {}
+        for name, outcome in zip(names, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning("%s transcription failed: %s", name, outcome)
+                results[name] = None
+            else:
+                results[name] = outcome
         
-        # Create tasks for all services
-        tasks = {}
-        for name, service in self.services.items():
-            tasks[name] = service.transcribe_segment(
+        return results
+    
+    async def _transcribe_primary_cached(
+        self,
+        audio_file_path: str,
+        medical_vocabulary: Sequence[str]
+    ) -> TranscriptionResult:
+        """
+        Run the primary Deepgram transcription, going through the cache.
+        
+        Re-running the same recording with the same vocabulary returns the
+        earlier result instead of paying for another full transcription.
+        
+        Args:
+            audio_file_path: Path to the audio file
+            medical_vocabulary: Terms sent as keyword boosts
+            
+        Returns:
+            The primary TranscriptionResult, cached or fresh
+        """
+        file_hash = await asyncio.to_thread(_file_sha256, audio_file_path)
+        vocabulary_hash = hashlib.sha256("\n".join(medical_vocabulary).encode()).hexdigest()
+        
+        return await self._cached_transcription(
+            f"deepgram-primary-{file_hash}-{vocabulary_hash}",
+            lambda: self.services["deepgram"].transcribe(
+                audio_file_path,
+                vocabulary_boost=medical_vocabulary
+            )
+        )
+    
+    async def _transcribe_segment_cached(
+        self,
+        name: str,
+        audio_file_path: str,
+        segment: UncertainSegment,
+        file_hash: str
+    ) -> TranscriptionResult:
+        """
+        Transcribe a segment from the audio file with one service, going
+        through the cache; used when no decoded PCM is available.
+        
+        Args:
+            name: Service name
+            audio_file_path: Path to the audio file
+            segment: The uncertain segment
+            file_hash: SHA-256 of the audio file
+            
+        Returns:
+            The service's TranscriptionResult, cached or fresh
+        """
+        return await self._cached_transcription(
+            f"{name}-segment-{file_hash}-{segment.start_time_ms}-{segment.end_time_ms}",
+            lambda: self.services[name].transcribe_segment(
                 audio_file_path,
                 segment.start_time_ms,
                 segment.end_time_ms
             )
+        )
+    
+    async def _transcribe_clip_cached(
+        self,
+        name: str,
+        clip: bytes,
+        clip_start_ms: int,
+        clip_hash: str
+    ) -> TranscriptionResult:
+        """
+        Transcribe a segment clip with one service, going through the cache.
         
-        # Execute concurrently
-        for name, task in tasks.items():
+        Args:
+            name: Service name
+            clip: WAV clip of the segment
+            clip_start_ms: Where the clip starts in the full recording
+            clip_hash: SHA-256 of the clip, shared by every service's key
+            
+        Returns:
+            The service's TranscriptionResult, cached or fresh
+        """
+        # Word times are offset by the clip start, so it is part of the key
+        return await self._cached_transcription(
+            f"{name}-{clip_start_ms}-{clip_hash}",
+            lambda: self.services[name].transcribe_segment_audio(clip, clip_start_ms)
+        )
+    
+    async def _cached_transcription(
+        self,
+        key: str,
+        transcribe: Callable[[], Awaitable[TranscriptionResult]]
+    ) -> TranscriptionResult:
+        """
+        Return the cached transcription for key, or run transcribe and cache it.
+        
+        Args:
+            key: Cache key identifying the audio and request
+            transcribe: Makes the provider call on a miss
+            
+        Returns:
+            The TranscriptionResult, cached or fresh
+        """
+        cached_text = await self.transcription_cache.get(key)
+        if cached_text is not None:
             try:
-                results[name] = await task
-            except Exception as e:
-                print(f"    Warning: {name} transcription failed: {e}")
-                results[name] = None
+                return TranscriptionResult.model_validate_json(cached_text)
+            except ValidationError:
+                pass
         
-        return results
+        result = await transcribe()
+        await self.transcription_cache.set(key, result.model_dump_json())
+        return result
     
     def _merge_decisions(
         self,
@@ -213,79 +480,40 @@ class TranscriptionOrchestrator:
         if not decisions:
             return primary_result
         
-        # Create a new word list with merged results
+        words = primary_result.words
+        starts = primary_result.start_times_ms
+        ends = primary_result.end_times_ms
+        
+        # Create a new word list with merged results: copy the untouched run
+        # before each segment as one slice, then the segment's replacement
         merged_words = []
-        decision_index = 0
-        i = 0
+        copied_up_to = 0
         
-        while i < len(primary_result.words):
-            word = primary_result.words[i]
+        for decision in sorted(decisions, key=lambda d: d.segment.start_time_ms):
+            segment = decision.segment
             
-            # Check if this word falls within an orchestrated segment
-            if decision_index < len(decisions):
-                decision = decisions[decision_index]
-                segment = decision.segment
-                
-                # Check if current word is within the segment
-                if (word.start_time_ms >= segment.start_time_ms and
-                    word.end_time_ms <= segment.end_time_ms):
-                    
-                    # Find the candidate that was chosen
-                    chosen_source = decision.chosen_source
-                    
-                    if chosen_source == "synthesized":
-                        # Use synthesized text - create words with estimated timestamps
-                        synthesized_words = self._create_words_from_text(
-                            decision.final_text,
-                            segment.start_time_ms,
-                            segment.end_time_ms,
-                            decision.confidence_boost
-                        )
-                        merged_words.extend(synthesized_words)
-                    elif chosen_source in decision.candidate_transcriptions:
-                        # Use words from chosen candidate
-                        candidate = decision.candidate_transcriptions[chosen_source]
-                        for cw in candidate.words:
-                            # Boost confidence based on orchestration
-                            boosted_word = Word(
-                                text=cw.text,
-                                start_time_ms=cw.start_time_ms,
-                                end_time_ms=cw.end_time_ms,
-                                confidence=decision.confidence_boost,
-                                speaker=cw.speaker
-                            )
-                            merged_words.append(boosted_word)
-                    else:
-                        # Fallback: use original words with boosted confidence
-                        for ow in segment.original_words:
-                            boosted_word = Word(
-                                text=ow.text,
-                                start_time_ms=ow.start_time_ms,
-                                end_time_ms=ow.end_time_ms,
-                                confidence=decision.confidence_boost,
-                                speaker=ow.speaker
-                            )
-                            merged_words.append(boosted_word)
-                    
-                    # Skip all words in this segment
-                    while (i < len(primary_result.words) and
-                           primary_result.words[i].end_time_ms <= segment.end_time_ms):
-                        i += 1
-                    
-                    decision_index += 1
-                    continue
+            # Words wholly inside the segment: first start at or after its
+            # start, through the last end at or before its end
+            lo = max(bisect_left(starts, segment.start_time_ms), copied_up_to)
+            hi = bisect_right(ends, segment.end_time_ms, lo)
+            if hi <= lo:
+                continue
             
-            # Word is not in any orchestrated segment, keep as-is
-            merged_words.append(word)
-            i += 1
+            merged_words.extend(words[copied_up_to:lo])
+            merged_words.extend(self._replacement_words(decision))
+            copied_up_to = hi
         
-        # Rebuild full text from merged words
-        full_text = " ".join(w.text for w in merged_words)
+        # Words after the last orchestrated segment, kept as-is
+        merged_words.extend(words[copied_up_to:])
         
-        # Calculate new overall confidence
+        # Rebuild full text and overall confidence from one pass over the
+        # merged words; map + attrgetter keep the per-word work in C
         if merged_words:
-            overall_confidence = sum(w.confidence for w in merged_words) / len(merged_words)
+            texts, confidences = zip(*map(attrgetter("text", "confidence"), merged_words))
+            full_text = " ".join(texts)
+            overall_confidence = sum(confidences) / len(confidences)
         else:
+            full_text = ""
             overall_confidence = primary_result.overall_confidence
         
         return TranscriptionResult(
@@ -298,6 +526,46 @@ class TranscriptionOrchestrator:
             raw_response=None
         )
     
+    def _replacement_words(self, decision: OrchestratorDecision) -> List[Word]:
+        """
+        Build the words that replace a segment, per the judge's choice.
+        
+        Args:
+            decision: The orchestrator decision for the segment
+            
+        Returns:
+            Replacement words carrying the boosted confidence
+        """
+        segment = decision.segment
+        chosen_source = decision.chosen_source
+        confidence = decision.confidence_boost
+        
+        if chosen_source == "silence":
+            # No speech in the segment; whatever was transcribed there is noise
+            return []
+        
+        if chosen_source == "synthesized":
+            # Use synthesized text - create words with estimated timestamps
+            return self._create_words_from_text(
+                decision.final_text,
+                segment.start_time_ms,
+                segment.end_time_ms,
+                confidence
+            )
+        
+        candidate = decision.candidate_transcriptions.get(chosen_source)
+        if candidate is not None:
+            # Use words from chosen candidate
+            source_words = candidate.words
+        else:
+            # Fallback: use original words
+            source_words = segment.original_words
+        
+        # Boost confidence based on orchestration; model_copy skips the
+        # field validation a fresh Word(...) would run
+        update = {"confidence": confidence}
+        return [w.model_copy(update=update) for w in source_words]
+    
     def _create_words_from_text(
         self,
         text: str,
@@ -321,21 +589,22 @@ class TranscriptionOrchestrator:
         if not words_list:
             return []
         
-        duration = end_ms - start_ms
-        word_duration = duration / len(words_list)
+        count = len(words_list)
+        word_duration = (end_ms - start_ms) / count
         
-        result = []
-        for i, word_text in enumerate(words_list):
-            word_start = int(start_ms + i * word_duration)
-            word_end = int(word_start + word_duration)
-            
-            result.append(Word(
+        # Every word gets the same whole-millisecond length, so only the
+        # starts need computing per word
+        word_length = int(word_duration)
+        word_starts = [int(start_ms + i * word_duration) for i in range(count)]
+        
+        return [
+            Word(
                 text=word_text,
                 start_time_ms=word_start,
-                end_time_ms=word_end,
+                end_time_ms=word_start + word_length,
                 confidence=confidence,
                 speaker=None
-            ))
-        
-        return result
+            )
+            for word_text, word_start in zip(words_list, word_starts)
+        ]
 
@@ -1,30 +1,86 @@
 """Nova Transcription Tool - FastAPI Backend Entry Point."""
 
+import asyncio
+import logging
+import logging.handlers
 import os
+import queue
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from config import settings
 
+logger = logging.getLogger(__name__)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that enqueues records unformatted.
+    
+    The stock handler formats (including tracebacks) in the logging thread
+    before enqueueing; with an in-process queue that work can be left to
+    the listener thread instead.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _start_logging() -> logging.handlers.QueueListener:
+    """Send root log records through a queue drained by a background thread."""
+    log_queue = queue.SimpleQueue()
+    
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    )
+    
+    root_logger = logging.getLogger()
+    root_logger.addHandler(_DeferredQueueHandler(log_queue))
+    root_logger.setLevel(logging.INFO)
+    
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    return listener
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler."""
     # Startup
+    log_listener = _start_logging()
+    
     # Ensure upload directory exists
     os.makedirs(settings.upload_dir, exist_ok=True)
     
-    print(f"Nova Transcription Tool starting...")
-    print(f"Upload directory: {settings.upload_dir}")
-    print(f"Deepgram API key: {'ready' if settings.deepgram_api_key else 'missing'}")
-    print(f"AssemblyAI API key: {'ready' if settings.assemblyai_api_key else 'missing'}")
-    print(f"OpenAI API key: {'ready' if settings.openai_api_key else 'missing'}")
+    logger.info("Nova Transcription Tool starting")
+    logger.info("Upload directory: %s", settings.upload_dir)
+    for name, key in (
+        ("Deepgram", settings.deepgram_api_key),
+        ("AssemblyAI", settings.assemblyai_api_key),
+        ("OpenAI", settings.openai_api_key),
+    ):
+        logger.info("%s API key: %s", name, "ready" if key else "missing")
+    
+    # Build the shared transcription clients up front so the first job
+    # does not pay for their setup
+    from api.routes.transcription import get_services
+    get_services()
+    
+    # Likewise start a post-processing worker and load its extractors
+    from services.post_processing import get_executor, warm_up_worker
+    await asyncio.get_running_loop().run_in_executor(get_executor(), warm_up_worker)
     
     yield
     
     # Shutdown
-    print("Nova shutting down...")
+    logger.info("Nova shutting down")
+    from api.routes.transcription import close_services
+    await close_services()
+    from services.post_processing import shutdown_executor
+    shutdown_executor()
+    log_listener.stop()
 
 
 # Create FastAPI application
@@ -65,10 +121,16 @@ async def root():
 
 if __name__ == "__main__":
     import uvicorn
+    # uvloop and httptools come with uvicorn[standard]; name them so a
+    # missing install fails at startup instead of silently falling back.
+    # Reload runs a single process, so it and workers are exclusive.
     uvicorn.run(
         "main:app",
         host=settings.host,
         port=settings.port,
-        reload=settings.debug
+        loop="uvloop",
+        http="httptools",
+        reload=settings.debug,
+        workers=None if settings.debug else settings.workers
     )
 
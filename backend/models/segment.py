@@ -1,7 +1,7 @@
 """Segment models for uncertain audio and orchestrator decisions."""
 
-from typing import List, Dict, Optional
-from pydantic import BaseModel, Field
+from typing import List, Dict, Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field
 
 from .transcription import Word, TranscriptionResult
 
@@ -50,7 +50,10 @@ class OrchestratorDecision(BaseModel):
     )
     chosen_source: str = Field(
         ...,
-        description="Which model was chosen: 'deepgram', 'assemblyai', 'whisper', or 'synthesized'"
+        description=(
+            "Which model was chosen: 'deepgram', 'assemblyai', 'whisper', or 'synthesized'; "
+            "'silence' if the segment held no speech and was not judged"
+        )
     )
     final_text: str = Field(..., description="The final selected or synthesized text")
     reasoning: str = Field(..., description="LLM's explanation for the decision")
@@ -77,3 +80,36 @@ class OrchestratorDecision(BaseModel):
             for name, candidate in self.candidate_transcriptions.items()
         }
 
+
+class JudgeVerdict(BaseModel):
+    """
+    The LLM judge's verdict for one segment, exactly as the model returns it.
+    
+    Its JSON schema is sent as the structured-output format, so every field
+    is required and no other keys are allowed.
+    """
+    
+    model_config = ConfigDict(extra="forbid")
+    
+    chosen_source: Literal["deepgram", "assemblyai", "whisper", "synthesized"]
+    final_text: str = Field(..., description="The selected or synthesized text")
+    reasoning: str = Field(..., description="Brief explanation of the decision")
+    confidence_boost: float = Field(..., description="New confidence level, 0-1")
+    synthesis_justification: Optional[str] = Field(
+        ...,
+        description="Only if synthesized - why ALL candidates were wrong"
+    )
+
+
+class BatchJudgeVerdict(JudgeVerdict):
+    """A verdict within a batched judge reply, tagged with its segment id."""
+    
+    id: int = Field(..., description="The segment id from the prompt")
+
+
+class JudgeVerdictBatch(BaseModel):
+    """A batched judge reply covering several segments."""
+    
+    model_config = ConfigDict(extra="forbid")
+    
+    verdicts: List[BatchJudgeVerdict]
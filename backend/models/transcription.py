@@ -1,8 +1,17 @@
 """Transcription models for Nova."""
 
-from typing import List, Optional, Dict, Any
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import cached_property
+from itertools import accumulate
+from typing import List, Optional, Dict, Any, Tuple
 from pydantic import BaseModel, Field
 
+# TranscriptionResult's cached per-word arrays, dropped when `words` is assigned
+_WORD_ARRAY_ATTRS = (
+    "confidences", "start_times_ms", "end_times_ms", "word_texts", "word_end_offsets"
+)
+
 
 class Word(BaseModel):
     """Represents a single transcribed word with metadata."""
@@ -39,27 +48,67 @@ class TranscriptionResult(BaseModel):
         """Total number of words in transcription."""
         return len(self.words)
     
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name == "words":
+            # Rebuild the cached arrays from the new words on next use
+            for attr in _WORD_ARRAY_ATTRS:
+                self.__dict__.pop(attr, None)
+    
+    # Per-field packed arrays over `words`, built on first use so scans don't
+    # dereference every Word. Assigning `words` drops them (see __setattr__);
+    # mutating the list in place does not.
+    
+    @cached_property
+    def confidences(self) -> array:
+        """Word confidences, in transcript order."""
+        return array("d", [w.confidence for w in self.words])
+    
+    @cached_property
+    def start_times_ms(self) -> array:
+        """Word start times in milliseconds, in transcript order."""
+        return array("q", [w.start_time_ms for w in self.words])
+    
+    @cached_property
+    def end_times_ms(self) -> array:
+        """Word end times in milliseconds, in transcript order."""
+        return array("q", [w.end_time_ms for w in self.words])
+    
+    @cached_property
+    def word_texts(self) -> List[str]:
+        """Word texts, in transcript order, for joining without touching the models."""
+        return [w.text for w in self.words]
+    
+    @cached_property
+    def word_end_offsets(self) -> array:
+        """Character offset just past each word (and its trailing space) in the space-joined words."""
+        return array("q", accumulate(len(text) + 1 for text in self.word_texts))
+    
+    # The range and context lookups below bisect the time arrays, relying on
+    # words being in time order (start and end times both non-decreasing).
+    
+    def _range_bounds(self, start_ms: int, end_ms: int) -> Tuple[int, int]:
+        """Index bounds of the words lying wholly within a time range."""
+        lo = bisect_left(self.start_times_ms, start_ms)
+        return lo, max(lo, bisect_right(self.end_times_ms, end_ms, lo))
+    
     def get_words_in_range(self, start_ms: int, end_ms: int) -> List[Word]:
         """Get all words within a time range."""
-        return [
-            word for word in self.words
-            if word.start_time_ms >= start_ms and word.end_time_ms <= end_ms
-        ]
+        lo, hi = self._range_bounds(start_ms, end_ms)
+        return self.words[lo:hi]
     
     def get_text_in_range(self, start_ms: int, end_ms: int) -> str:
         """Get concatenated text for a time range."""
-        words = self.get_words_in_range(start_ms, end_ms)
-        return " ".join(word.text for word in words)
+        lo, hi = self._range_bounds(start_ms, end_ms)
+        return " ".join(self.word_texts[lo:hi])
     
     def get_context_before(self, position_ms: int, word_count: int = 50) -> str:
         """Get context words before a given position."""
-        words_before = [w for w in self.words if w.end_time_ms <= position_ms]
-        context_words = words_before[-word_count:] if len(words_before) > word_count else words_before
-        return " ".join(word.text for word in context_words)
+        end = bisect_right(self.end_times_ms, position_ms)
+        return " ".join(self.word_texts[max(0, end - word_count):end])
     
     def get_context_after(self, position_ms: int, word_count: int = 50) -> str:
         """Get context words after a given position."""
-        words_after = [w for w in self.words if w.start_time_ms >= position_ms]
-        context_words = words_after[:word_count]
-        return " ".join(word.text for word in context_words)
+        start = bisect_left(self.start_times_ms, position_ms)
+        return " ".join(self.word_texts[start:start + word_count])
 
@@ -1,7 +1,10 @@
 """Clinical data extraction from transcriptions."""
 
 import re
-from typing import List, Tuple, Optional
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, repeat
+from operator import itemgetter
+from typing import Dict, List, Tuple, Optional
 
 from models.transcription import TranscriptionResult
 from models.clinical_data import (
@@ -9,6 +12,31 @@ from models.clinical_data import (
     ActionItemCategory, ActionItemPriority, NumericalCategory
 )
 
+# Important phrases reported per transcription
+MAX_IMPORTANT_PHRASES = 20
+
+# Maps every sentence terminator to "." so one str.split finds them all
+_SENTENCE_END_TABLE = str.maketrans("!?", "..")
+
+
+def _combine_keywords(keywords_by_category: dict) -> Tuple[re.Pattern, Dict[str, Tuple[int, int]]]:
+    """
+    Compile keyword lists into one regex that reports every occurrence.
+    
+    The alternation sits in a lookahead, so overlapping keywords are all
+    found; at a given position the earliest-listed keyword wins.
+    
+    Returns:
+        Tuple of (combined regex, keyword -> (category index, keyword index))
+    """
+    ranks = {}
+    for category_index, keywords in enumerate(keywords_by_category.values()):
+        for keyword_index, keyword in enumerate(keywords):
+            ranks[keyword] = (category_index, keyword_index)
+    
+    alternation = "|".join(map(re.escape, ranks))
+    return re.compile(f"(?=({alternation}))"), ranks
+
 
 class ClinicalExtractor:
     """
@@ -59,6 +87,13 @@ class ClinicalExtractor:
         (r"(\d+)[\s]*(?:units?)", "dosage", NumericalCategory.DOSAGE, "units"),
     ]
     
+    # Compiled once. Each pattern scans the text on its own, as a single
+    # alternation would report only one of two overlapping matches.
+    VITAL_REGEXES = [
+        (re.compile(pattern, re.IGNORECASE), label, category, unit)
+        for pattern, label, category, unit in VITAL_PATTERNS
+    ]
+    
     # Action item keywords by category
     ACTION_KEYWORDS = {
         ActionItemCategory.PRESCRIPTION: [
@@ -83,6 +118,10 @@ class ClinicalExtractor:
         ],
     }
     
+    # All action keywords as one regex, so the text is scanned once
+    ACTION_KEYWORD_REGEX, ACTION_KEYWORD_RANKS = _combine_keywords(ACTION_KEYWORDS)
+    ACTION_CATEGORIES = list(ACTION_KEYWORDS)
+    
     # Medical terminology list
     MEDICAL_TERMS = [
         "hypertension", "hypotension", "diabetes", "diabetic", "mellitus",
@@ -99,6 +138,57 @@ class ClinicalExtractor:
         "amlodipine", "omeprazole", "levothyroxine", "gabapentin"
     ]
     
+    # Whole-word matches of any term (plurals included), longest first
+    MEDICAL_TERMS_REGEX = re.compile(
+        r"\b("
+        + "|".join(map(re.escape, sorted(MEDICAL_TERMS, key=len, reverse=True)))
+        + r")(?:e?s)?\b"
+    )
+    
+    # Important clinical phrase patterns, in reporting order
+    IMPORTANT_PHRASE_REGEXES = tuple(
+        re.compile(pattern, re.IGNORECASE)
+        for pattern in (
+            r"patient (?:reports?|states?|complains? of|presents? with) .{10,100}",
+            r"diagnosed with .{5,50}",
+            r"history of .{5,50}",
+            r"allergic to .{5,50}",
+            r"no known .{5,30}",
+            r"family history .{5,50}",
+            r"recommend(?:s|ed|ing)? .{5,100}",
+            r"concern(?:s|ed)? (?:about|for|regarding) .{5,50}",
+        )
+    )
+    
+    # Priority cues, matched anywhere in a sentence like a substring check
+    HIGH_PRIORITY_REGEX = re.compile("|".join(map(re.escape, (
+        "urgent", "immediately", "emergency", "asap", "critical",
+        "today", "right away", "stat", "concerning", "worrisome"
+    ))))
+    LOW_PRIORITY_REGEX = re.compile("|".join(map(re.escape, (
+        "optional", "consider", "if possible", "when convenient",
+        "routine", "annual", "yearly"
+    ))))
+    
+    def __init__(self, validate_models: bool = False):
+        """
+        Initialize the extractor.
+        
+        Args:
+            validate_models: Build results with full pydantic validation.
+                Every field comes from this class's own patterns and tables,
+                so by default validation is skipped; enable it when changing
+                those tables to check they still produce valid models.
+        """
+        if validate_models:
+            self._new_numerical_value = NumericalValue
+            self._new_action_item = ActionItem
+            self._new_extraction = ClinicalExtraction
+        else:
+            self._new_numerical_value = NumericalValue.model_construct
+            self._new_action_item = ActionItem.model_construct
+            self._new_extraction = ClinicalExtraction.model_construct
+    
     def extract(self, transcription: TranscriptionResult) -> ClinicalExtraction:
         """
         Extract all clinical data from transcription.
@@ -109,14 +199,15 @@ class ClinicalExtractor:
         Returns:
             ClinicalExtraction with action items, numerical values, etc.
         """
-        full_text = transcription.full_text.lower()
+        # Lower-cased once and shared by every extractor
+        full_text_lower = transcription.full_text.lower()
         
-        numerical_values = self._extract_numerical_values(transcription)
-        action_items = self._extract_action_items(transcription)
-        medical_terms = self._extract_medical_terms(full_text)
+        numerical_values = self._extract_numerical_values(transcription, full_text_lower)
+        action_items = self._extract_action_items(transcription, full_text_lower)
+        medical_terms = self._extract_medical_terms(full_text_lower)
         important_phrases = self._extract_important_phrases(transcription)
         
-        return ClinicalExtraction(
+        return self._new_extraction(
             action_items=action_items,
             numerical_values=numerical_values,
             important_phrases=important_phrases,
@@ -125,201 +216,180 @@ class ClinicalExtractor:
     
     def _extract_numerical_values(
         self,
-        transcription: TranscriptionResult
+        transcription: TranscriptionResult,
+        full_text_lower: str
     ) -> List[NumericalValue]:
         """Extract numerical values using regex patterns."""
-        values = []
-        full_text = transcription.full_text.lower()
         seen_values = set()  # Avoid duplicates
         
-        for pattern, label, category, unit in self.VITAL_PATTERNS:
-            matches = re.finditer(pattern, full_text, re.IGNORECASE)
-            for match in matches:
-                # Get the primary value (first capture group)
-                value = match.group(1)
-                
-                # For blood pressure, combine systolic/diastolic
-                if label == "blood_pressure" and len(match.groups()) >= 2:
-                    value = f"{match.group(1)}/{match.group(2)}"
-                
-                # Detect unit from match if pattern supports it
-                detected_unit = unit
-                if len(match.groups()) >= 2 and label in ["weight", "dosage"]:
-                    matched_unit = match.group(2)
-                    if matched_unit:
-                        detected_unit = matched_unit.lower()
-                
-                # Find timestamp for this match
-                timestamp_ms = self._find_timestamp_for_position(
-                    transcription,
-                    match.start()
-                )
-                
-                # Create unique key to avoid duplicates
-                key = f"{label}:{value}:{timestamp_ms}"
-                if key in seen_values:
-                    continue
-                seen_values.add(key)
-                
-                values.append(NumericalValue(
-                    value=value,
-                    unit=detected_unit,
-                    category=category,
-                    label=label.replace("_", " ").title(),
-                    timestamp_ms=timestamp_ms,
-                    related_segment_index=0,
-                    raw_text=match.group(0)
-                ))
+        matches = [
+            (match, label, category, unit)
+            for regex, label, category, unit in self.VITAL_REGEXES
+            for match in regex.finditer(full_text_lower)
+        ]
+        timestamps = self._find_timestamps_for_positions(
+            transcription,
+            [match.start() for match, _, _, _ in matches]
+        )
+        
+        # Deduplicate in pattern order, so the earlier pattern's reading wins
+        found = []
+        for (match, label, category, unit), timestamp_ms in zip(matches, timestamps):
+            capture_count = len(match.groups())
+            
+            # Get the primary value (first capture group)
+            value = match.group(1)
+            
+            # For blood pressure, combine systolic/diastolic
+            if label == "blood_pressure" and capture_count >= 2:
+                value = f"{match.group(1)}/{match.group(2)}"
+            
+            # Detect unit from match if pattern supports it
+            detected_unit = unit
+            if capture_count >= 2 and label in ["weight", "dosage"]:
+                matched_unit = match.group(2)
+                if matched_unit:
+                    detected_unit = matched_unit.lower()
+            
+            # Create unique key to avoid duplicates
+            key = (label, value, timestamp_ms)
+            if key in seen_values:
+                continue
+            seen_values.add(key)
+            
+            found.append((match.start(), self._new_numerical_value(
+                value=value,
+                unit=detected_unit,
+                category=category,
+                label=label.replace("_", " ").title(),
+                timestamp_ms=timestamp_ms,
+                related_segment_index=0,
+                raw_text=match.group(0)
+            )))
         
-        return values
+        # Report in text order, which the timeline relies on; the sort is
+        # stable, so matches at one position keep pattern order
+        found.sort(key=itemgetter(0))
+        return [value for _, value in found]
     
     def _extract_action_items(
         self,
-        transcription: TranscriptionResult
+        transcription: TranscriptionResult,
+        full_text_lower: str
     ) -> List[ActionItem]:
         """Extract action items from transcription."""
         items = []
-        full_text = transcription.full_text.lower()
+        full_text = transcription.full_text
         
-        # Split into sentences
-        sentences = re.split(r'[.!?]+', transcription.full_text)
+        # Split into sentences, keeping their positions in the text; each
+        # piece is followed by its one-character terminator
+        sentences = full_text.translate(_SENTENCE_END_TABLE).split(".")
+        sentence_starts = [0, *accumulate(len(sentence) + 1 for sentence in sentences[:-1])]
         
-        for sentence in sentences:
-            sentence_lower = sentence.lower().strip()
-            if not sentence_lower:
-                continue
-            
-            # Check each category's keywords
-            for category, keywords in self.ACTION_KEYWORDS.items():
-                for keyword in keywords:
-                    if keyword in sentence_lower:
-                        # Find timestamp
-                        pos = full_text.find(sentence_lower[:20])
-                        timestamp_ms = self._find_timestamp_for_position(
-                            transcription, max(0, pos)
-                        )
-                        
-                        # Determine priority
-                        priority = self._determine_priority(sentence_lower)
-                        
-                        items.append(ActionItem(
-                            text=sentence.strip(),
-                            category=category,
-                            priority=priority,
-                            timestamp_ms=timestamp_ms,
-                            related_segment_index=0,
-                            keywords=[keyword]
-                        ))
-                        break  # Only add once per sentence per category
+        # One scan finds every keyword; per sentence and category keep the
+        # earliest-listed keyword present, as a per-keyword check would
+        best = {}
+        for hit in self.ACTION_KEYWORD_REGEX.finditer(full_text_lower):
+            category_index, keyword_index = self.ACTION_KEYWORD_RANKS[hit.group(1)]
+            key = (bisect_right(sentence_starts, hit.start()) - 1, category_index)
+            if keyword_index < best.get(key, len(self.ACTION_KEYWORD_RANKS)):
+                best[key] = keyword_index
         
-        # Remove duplicate action items
-        seen = set()
-        unique_items = []
-        for item in items:
-            key = item.text[:50]
-            if key not in seen:
-                seen.add(key)
-                unique_items.append(item)
+        # Sentence order, then category order; one item per sentence per category
+        found = sorted(best.items())
+        spans = []
+        for (sentence_index, _), _ in found:
+            sentence = sentences[sentence_index]
+            leading = len(sentence) - len(sentence.lstrip())
+            spans.append((sentence.strip(), sentence_starts[sentence_index] + leading))
         
-        return unique_items
-    
-    def _extract_medical_terms(self, full_text: str) -> List[str]:
-        """Extract recognized medical terminology."""
-        found_terms = []
-        full_text_lower = full_text.lower()
+        timestamps = self._find_timestamps_for_positions(
+            transcription,
+            [pos for _, pos in spans]
+        )
         
-        for term in self.MEDICAL_TERMS:
-            if term in full_text_lower:
-                found_terms.append(term)
+        for ((_, category_index), keyword_index), (text, pos), timestamp_ms in zip(
+            found, spans, timestamps
+        ):
+            category = self.ACTION_CATEGORIES[category_index]
+            
+            # The same span of the lower-cased text, instead of lowering again
+            text_lower = full_text_lower[pos:pos + len(text)]
+            
+            items.append(self._new_action_item(
+                text=text,
+                category=category,
+                priority=self._determine_priority(text_lower),
+                timestamp_ms=timestamp_ms,
+                related_segment_index=0,
+                keywords=[self.ACTION_KEYWORDS[category][keyword_index]]
+            ))
         
-        return list(set(found_terms))
+        # Keyed by (sentence, category) above, so there are no duplicates to remove
+        return items
+    
+    def _extract_medical_terms(self, full_text_lower: str) -> List[str]:
+        """Extract recognized medical terminology, in order of first mention."""
+        return list(dict.fromkeys(self.MEDICAL_TERMS_REGEX.findall(full_text_lower)))
     
     def _extract_important_phrases(
         self,
         transcription: TranscriptionResult
     ) -> List[str]:
         """Extract important clinical phrases."""
-        important_patterns = [
-            r"patient (?:reports?|states?|complains? of|presents? with) .{10,100}",
-            r"diagnosed with .{5,50}",
-            r"history of .{5,50}",
-            r"allergic to .{5,50}",
-            r"no known .{5,30}",
-            r"family history .{5,50}",
-            r"recommend(?:s|ed|ing)? .{5,100}",
-            r"concern(?:s|ed)? (?:about|for|regarding) .{5,50}",
-        ]
-        
         phrases = []
         full_text = transcription.full_text
         
-        for pattern in important_patterns:
-            matches = re.finditer(pattern, full_text, re.IGNORECASE)
-            for match in matches:
+        for regex in self.IMPORTANT_PHRASE_REGEXES:
+            for match in regex.finditer(full_text):
                 phrase = match.group(0).strip()
                 if phrase and len(phrase) > 10:
                     phrases.append(phrase)
+                    if len(phrases) == MAX_IMPORTANT_PHRASES:
+                        return phrases
         
-        return phrases[:20]  # Limit to 20 phrases
+        return phrases
     
-    def _find_timestamp_for_position(
+    def _find_timestamps_for_positions(
         self,
         transcription: TranscriptionResult,
-        char_position: int
-    ) -> int:
+        char_positions: List[int]
+    ) -> List[int]:
         """
-        Find the timestamp for a character position in the text.
+        Find the timestamps for character positions in the text.
         
         Args:
             transcription: Transcription with word-level timestamps
-            char_position: Character position in full_text
+            char_positions: Character positions in full_text
             
         Returns:
-            Timestamp in milliseconds
+            Timestamp in milliseconds for each position
         """
         if not transcription.words:
-            return 0
+            return [0] * len(char_positions)
         
-        # Build character offset map
-        current_pos = 0
-        for word in transcription.words:
-            word_end_pos = current_pos + len(word.text) + 1  # +1 for space
-            if char_position <= word_end_pos:
-                return word.start_time_ms
-            current_pos = word_end_pos
-        
-        # Default to last word
-        return transcription.words[-1].start_time_ms
+        # First word whose end offset is at or past each position; past the
+        # last word, default to the last word. map keeps the loop in C.
+        indexes = map(bisect_left, repeat(transcription.word_end_offsets), char_positions)
+        starts = transcription.start_times_ms
+        last = len(starts) - 1
+        return [starts[min(index, last)] for index in indexes]
     
-    def _determine_priority(self, sentence: str) -> ActionItemPriority:
+    def _determine_priority(self, sentence_lower: str) -> ActionItemPriority:
         """
         Determine priority level for an action item.
         
         Args:
-            sentence: The sentence containing the action item
+            sentence_lower: The lower-cased sentence containing the action item
             
         Returns:
             Priority level
         """
-        high_priority_terms = [
-            "urgent", "immediately", "emergency", "asap", "critical",
-            "today", "right away", "stat", "concerning", "worrisome"
-        ]
-        
-        low_priority_terms = [
-            "optional", "consider", "if possible", "when convenient",
-            "routine", "annual", "yearly"
-        ]
-        
-        sentence_lower = sentence.lower()
-        
-        for term in high_priority_terms:
-            if term in sentence_lower:
-                return ActionItemPriority.HIGH
+        if self.HIGH_PRIORITY_REGEX.search(sentence_lower):
+            return ActionItemPriority.HIGH
         
-        for term in low_priority_terms:
-            if term in sentence_lower:
-                return ActionItemPriority.LOW
+        if self.LOW_PRIORITY_REGEX.search(sentence_lower):
+            return ActionItemPriority.LOW
         
         return ActionItemPriority.MEDIUM
 
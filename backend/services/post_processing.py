@@ -0,0 +1,84 @@
+"""CPU-bound post-transcription stages, run in worker processes."""
+
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from models.transcription import TranscriptionResult
+from models.segment import OrchestratorDecision
+from models.clinical_data import ClinicalExtraction, TimelineData
+
+# Shared pool for all jobs (see get_executor)
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Get the process pool used for post-processing, creating it on first use."""
+    global _executor
+    
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor()
+    
+    return _executor
+
+
+def shutdown_executor():
+    """Stop the worker processes, if the pool was ever started."""
+    global _executor
+    
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+@lru_cache(maxsize=1)
+def _get_generators():
+    """Build the extractor and timeline generator once per worker process."""
+    from services.clinical_extractor import ClinicalExtractor
+    from services.timeline_generator import TimelineGenerator
+    
+    return ClinicalExtractor(), TimelineGenerator()
+
+
+def warm_up_worker():
+    """
+    Prepare a pool worker ahead of the first job.
+    
+    Submitted at startup so the process spawn, imports and the extractor's
+    regex compilation happen before any request is waiting on them.
+    """
+    _get_generators()
+
+
+def run_post_processing(
+    transcription: TranscriptionResult,
+    orchestrator_decisions: List[OrchestratorDecision]
+) -> Tuple[ClinicalExtraction, TimelineData]:
+    """
+    Extract clinical data and build the timeline for a finished transcription.
+    
+    Runs inside a pool worker, so the arguments and results cross the
+    process boundary once per job.
+    
+    Args:
+        transcription: Final transcription result
+        orchestrator_decisions: Decisions made while resolving segments
+    
+    Returns:
+        Tuple of (clinical data, timeline data)
+    """
+    clinical_extractor, timeline_generator = _get_generators()
+    
+    clinical_data = clinical_extractor.extract(transcription)
+    timeline_data = timeline_generator.generate(
+        transcription,
+        orchestrator_decisions,
+        clinical_data
+    )
+    
+    return clinical_data, timeline_data
@@ -1,5 +1,10 @@
 """Timeline data generator for frontend visualization."""
 
+import heapq
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from operator import attrgetter
+from itertools import repeat
 from typing import List, Optional
 
 from models.transcription import TranscriptionResult
@@ -20,11 +25,28 @@ class TimelineGenerator:
     - Orchestrator resolved segments (purple)
     """
     
+    def __init__(self, validate_models: bool = False):
+        """
+        Initialize the generator.
+        
+        Args:
+            validate_models: Build markers and timeline data with full pydantic
+                validation. Every field is copied from already-validated
+                decisions and clinical data, so by default validation is skipped.
+        """
+        if validate_models:
+            self._new_marker = TimelineMarker
+            self._new_timeline = TimelineData
+        else:
+            self._new_marker = TimelineMarker.model_construct
+            self._new_timeline = TimelineData.model_construct
+    
     def generate(
         self,
         transcription: TranscriptionResult,
         orchestrator_decisions: List[OrchestratorDecision],
-        clinical_data: ClinicalExtraction
+        clinical_data: ClinicalExtraction,
+        word_timestamps: Optional[List[dict]] = None
     ) -> TimelineData:
         """
         Generate complete timeline data.
@@ -33,18 +55,25 @@ class TimelineGenerator:
             transcription: Final transcription result
             orchestrator_decisions: List of orchestrator decisions
             clinical_data: Extracted clinical data
+            word_timestamps: Precomputed output of generate_word_timestamps,
+                so it can run alongside clinical extraction
             
         Returns:
             TimelineData for frontend rendering
         """
-        markers = []
+        # Each source list below is already in time order (decisions follow
+        # the segments, extracted items follow their text positions), so the
+        # markers are merged rather than sorted
+        decision_markers = []
+        action_markers = []
+        value_markers = []
         
         # Add markers for orchestrator decisions (uncertain -> resolved)
         for decision in orchestrator_decisions:
             segment = decision.segment
             
             # Mark as resolved if successfully orchestrated
-            markers.append(TimelineMarker(
+            decision_markers.append(self._new_marker(
                 start_ms=segment.start_time_ms,
                 end_ms=segment.end_time_ms,
                 type=TimelineMarkerType.ORCHESTRATOR_RESOLVED,
@@ -61,16 +90,18 @@ class TimelineGenerator:
         # Add markers for action items
         for item in clinical_data.action_items:
             # Estimate end time (action items typically span ~5 seconds of speech)
-            end_ms = item.timestamp_ms + 5000
+            start_ms = item.timestamp_ms
+            text = item.text
+            category = item.category.value
             
-            markers.append(TimelineMarker(
-                start_ms=item.timestamp_ms,
-                end_ms=end_ms,
+            action_markers.append(self._new_marker(
+                start_ms=start_ms,
+                end_ms=start_ms + 5000,
                 type=TimelineMarkerType.ACTION_ITEM,
-                label=f"{item.category.value}: {item.text[:30]}...",
+                label=f"{category}: {text[:30]}...",
                 data={
-                    "text": item.text,
-                    "category": item.category.value,
+                    "text": text,
+                    "category": category,
                     "priority": item.priority.value,
                     "keywords": item.keywords
                 }
@@ -79,38 +110,47 @@ class TimelineGenerator:
         # Add markers for numerical values
         for value in clinical_data.numerical_values:
             # Numerical values are typically short (~2 seconds)
-            end_ms = value.timestamp_ms + 2000
+            start_ms = value.timestamp_ms
+            label = value.label
+            number = value.value
+            unit = value.unit
             
-            markers.append(TimelineMarker(
-                start_ms=value.timestamp_ms,
-                end_ms=end_ms,
+            value_markers.append(self._new_marker(
+                start_ms=start_ms,
+                end_ms=start_ms + 2000,
                 type=TimelineMarkerType.NUMERICAL_VALUE,
-                label=f"{value.label}: {value.value}{value.unit or ''}",
+                label=f"{label}: {number}{unit or ''}",
                 data={
-                    "value": value.value,
-                    "unit": value.unit,
+                    "value": number,
+                    "unit": unit,
                     "category": value.category.value,
-                    "label": value.label,
+                    "label": label,
                     "raw_text": value.raw_text
                 }
             ))
         
-        # Sort markers by start time
-        markers.sort(key=lambda m: m.start_ms)
+        # Merge markers by start time
+        markers = list(heapq.merge(
+            decision_markers,
+            action_markers,
+            value_markers,
+            key=attrgetter("start_ms")
+        ))
         
         # Generate word timestamps for karaoke sync
-        word_timestamps = self._generate_word_timestamps(
-            transcription,
-            orchestrator_decisions
-        )
+        if word_timestamps is None:
+            word_timestamps = self.generate_word_timestamps(
+                transcription,
+                orchestrator_decisions
+            )
         
-        return TimelineData(
+        return self._new_timeline(
             duration_ms=transcription.duration_ms,
             markers=markers,
             word_timestamps=word_timestamps
         )
     
-    def _generate_word_timestamps(
+    def generate_word_timestamps(
         self,
         transcription: TranscriptionResult,
         decisions: List[OrchestratorDecision]
@@ -119,6 +159,7 @@ class TimelineGenerator:
         Generate word-level timestamps for karaoke-style highlighting.
         
         Includes metadata about whether each word was uncertain or resolved.
+        Does not depend on clinical data, so it can run before extraction finishes.
         
         Args:
             transcription: The transcription result
@@ -127,42 +168,39 @@ class TimelineGenerator:
         Returns:
             List of word timestamp objects for frontend
         """
-        word_timestamps = []
-        
-        # Build a set of time ranges that were orchestrated
-        orchestrated_ranges = []
-        for decision in decisions:
-            orchestrated_ranges.append((
-                decision.segment.start_time_ms,
-                decision.segment.end_time_ms,
-                decision
-            ))
+        words = transcription.words
         
-        for word in transcription.words:
-            # Check if this word is in an orchestrated segment
-            is_orchestrated = False
-            orchestrator_source = None
+        if decisions:
+            starts = transcription.start_times_ms
+            ends = transcription.end_times_ms
             
-            for start, end, decision in orchestrated_ranges:
-                if word.start_time_ms >= start and word.end_time_ms <= end:
-                    is_orchestrated = True
-                    orchestrator_source = decision.chosen_source
-                    break
-            
-            word_data = {
+            # Mark each orchestrated segment's words in one slice assignment:
+            # first start at or after the segment start through the last end at
+            # or before its end (segments never overlap, so no word is claimed twice)
+            sources = [None] * len(words)
+            for decision in decisions:
+                segment = decision.segment
+                lo = bisect_left(starts, segment.start_time_ms)
+                hi = bisect_right(ends, segment.end_time_ms, lo)
+                if hi > lo:
+                    sources[lo:hi] = [decision.chosen_source] * (hi - lo)
+        else:
+            # Nothing was orchestrated, so skip building the time arrays
+            sources = repeat(None)
+        
+        return [
+            {
                 "text": word.text,
                 "start_ms": word.start_time_ms,
                 "end_ms": word.end_time_ms,
                 "confidence": word.confidence,
                 "speaker": word.speaker,
-                "is_uncertain": word.confidence < 0.75 and not is_orchestrated,
-                "was_orchestrator_resolved": is_orchestrated,
-                "orchestrator_source": orchestrator_source
+                "is_uncertain": source is None and word.confidence < 0.75,
+                "was_orchestrator_resolved": source is not None,
+                "orchestrator_source": source
             }
-            
-            word_timestamps.append(word_data)
-        
-        return word_timestamps
+            for word, source in zip(words, sources)
+        ]
     
     def get_marker_summary(self, timeline_data: TimelineData) -> dict:
         """
@@ -174,24 +212,14 @@ class TimelineGenerator:
         Returns:
             Summary dictionary
         """
-        summary = {
+        counts = Counter(marker.type for marker in timeline_data.markers)
+        
+        return {
             "total_markers": len(timeline_data.markers),
-            "action_items": 0,
-            "numerical_values": 0,
-            "uncertain_segments": 0,
-            "orchestrator_resolved": 0,
+            "action_items": counts[TimelineMarkerType.ACTION_ITEM],
+            "numerical_values": counts[TimelineMarkerType.NUMERICAL_VALUE],
+            "uncertain_segments": counts[TimelineMarkerType.UNCERTAIN],
+            "orchestrator_resolved": counts[TimelineMarkerType.ORCHESTRATOR_RESOLVED],
             "duration_seconds": timeline_data.duration_ms / 1000
         }
-        
-        for marker in timeline_data.markers:
-            if marker.type == TimelineMarkerType.ACTION_ITEM:
-                summary["action_items"] += 1
-            elif marker.type == TimelineMarkerType.NUMERICAL_VALUE:
-                summary["numerical_values"] += 1
-            elif marker.type == TimelineMarkerType.UNCERTAIN:
-                summary["uncertain_segments"] += 1
-            elif marker.type == TimelineMarkerType.ORCHESTRATOR_RESOLVED:
-                summary["orchestrator_resolved"] += 1
-        
-        return summary
 
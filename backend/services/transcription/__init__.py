@@ -4,6 +4,7 @@ from .base import BaseTranscriptionService, TranscriptionResult, Word
 from .deepgram import DeepgramService
 from .assemblyai import AssemblyAIService
 from .whisper import WhisperService
+from .local_whisper import FasterWhisperService
 
 __all__ = [
     "BaseTranscriptionService",
@@ -12,5 +13,6 @@ __all__ = [
     "DeepgramService",
     "AssemblyAIService",
     "WhisperService",
+    "FasterWhisperService",
 ]
 
@@ -1,9 +1,8 @@
 """AssemblyAI transcription service implementation using official SDK."""
 
-import os
+import io
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
-from typing import List, Optional
+from typing import BinaryIO, Optional, Sequence, Union
 
 import assemblyai as aai
 
@@ -22,11 +21,21 @@ class AssemblyAIService(BaseTranscriptionService):
     - Robust file handling
     """
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, max_workers: int = 8):
+        """
+        Initialize the service.
+        
+        Args:
+            api_key: AssemblyAI API key
+            max_workers: Transcriptions that can be in flight at once; each
+                holds one SDK thread while it uploads and polls
+        """
         super().__init__(api_key)
         # Set the API key for the SDK
         aai.settings.api_key = api_key
-        self._executor = ThreadPoolExecutor(max_workers=3)
+        # One transcriber for all calls; its own worker pool runs the
+        # upload-and-poll cycle behind transcribe_async
+        self._transcriber = aai.Transcriber(max_workers=max_workers)
     
     @property
     def model_name(self) -> str:
@@ -37,32 +46,28 @@ class AssemblyAIService(BaseTranscriptionService):
         audio_file_path: str,
         language: str = "en",
         enable_speaker_diarization: bool = True,
-        vocabulary_boost: Optional[List[str]] = None
+        vocabulary_boost: Optional[Sequence[str]] = None
     ) -> TranscriptionResult:
         """Transcribe audio using AssemblyAI SDK."""
-        
-        # Run synchronous SDK in thread pool
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            self._executor,
-            self._transcribe_sync,
-            audio_file_path,
-            language,
-            enable_speaker_diarization,
-            vocabulary_boost
-        )
-        return result
+        config = self._build_config(language, enable_speaker_diarization, vocabulary_boost)
+        return await self._transcribe_source(audio_file_path, config)
     
-    def _transcribe_sync(
+    async def _transcribe_wav_bytes(
+        self,
+        audio_data: bytes,
+        language: str
+    ) -> TranscriptionResult:
+        """Transcribe in-memory WAV audio; the SDK uploads file-like data directly."""
+        config = self._build_config(language, False, None)
+        return await self._transcribe_source(io.BytesIO(audio_data), config)
+    
+    def _build_config(
         self,
-        audio_file_path: str,
         language: str,
         enable_speaker_diarization: bool,
-        vocabulary_boost: Optional[List[str]]
-    ) -> TranscriptionResult:
-        """Synchronous transcription using SDK."""
-        
-        # Build config
+        vocabulary_boost: Optional[Sequence[str]]
+    ) -> aai.TranscriptionConfig:
+        """Build the SDK transcription config for one request."""
         config = aai.TranscriptionConfig(
             language_code=language,
             speaker_labels=enable_speaker_diarization,
@@ -72,61 +77,31 @@ class AssemblyAIService(BaseTranscriptionService):
         
         # Add word boost if provided
         if vocabulary_boost:
-            config.word_boost = vocabulary_boost
+            config.word_boost = list(vocabulary_boost)
             config.boost_param = aai.WordBoost.high
         
-        # Create transcriber and transcribe
-        transcriber = aai.Transcriber(config=config)
-        transcript = transcriber.transcribe(audio_file_path)
-        
-        # Check for errors
-        if transcript.status == aai.TranscriptStatus.error:
-            raise Exception(f"AssemblyAI transcription failed: {transcript.error}")
-        
-        return self._parse_transcript(transcript)
+        return config
     
-    async def transcribe_segment(
+    async def _transcribe_source(
         self,
-        audio_file_path: str,
-        start_time_ms: int,
-        end_time_ms: int,
-        language: str = "en"
+        audio_source: Union[str, BinaryIO],
+        config: aai.TranscriptionConfig
     ) -> TranscriptionResult:
-        """Transcribe a specific segment of audio."""
+        """
+        Transcribe a file path or file-like object.
         
-        # Extract segment to temp file
-        segment_path = self._extract_audio_segment(
-            audio_file_path,
-            start_time_ms,
-            end_time_ms
+        The SDK streams the source to the upload endpoint, so files are not
+        read into memory first.
+        """
+        transcript = await asyncio.wrap_future(
+            self._transcriber.transcribe_async(audio_source, config=config)
         )
         
-        try:
-            # Transcribe the segment
-            result = await self.transcribe(
-                segment_path,
-                language=language,
-                enable_speaker_diarization=False
-            )
-            
-            # Adjust timestamps to be relative to original audio
-            adjusted_words = []
-            for word in result.words:
-                adjusted_words.append(Word(
-                    text=word.text,
-                    start_time_ms=word.start_time_ms + start_time_ms,
-                    end_time_ms=word.end_time_ms + start_time_ms,
-                    confidence=word.confidence,
-                    speaker=word.speaker
-                ))
-            
-            result.words = adjusted_words
-            return result
-            
-        finally:
-            # Clean up temp file
-            if os.path.exists(segment_path):
-                os.remove(segment_path)
+        # Check for errors
+        if transcript.status == aai.TranscriptStatus.error:
+            raise Exception(f"AssemblyAI transcription failed: {transcript.error}")
+        
+        return self._parse_transcript(transcript)
     
     def _parse_transcript(self, transcript: aai.Transcript) -> TranscriptionResult:
         """Parse AssemblyAI transcript into TranscriptionResult."""
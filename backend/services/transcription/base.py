@@ -1,9 +1,14 @@
 """Base transcription service interface."""
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import List, Optional, Sequence
 
 from models.transcription import TranscriptionResult, Word
+from utils.audio_utils import extract_audio_segment_wav
+
+# Context kept on each side of a segment when it is cut from the file
+SEGMENT_PADDING_MS = 100
 
 
 class BaseTranscriptionService(ABC):
@@ -16,13 +21,17 @@ class BaseTranscriptionService(ABC):
         """Initialize with API key."""
         self.api_key = api_key
     
+    async def aclose(self):
+        """Release pooled connections; services holding none need not override."""
+        pass
+    
     @abstractmethod
     async def transcribe(
         self,
         audio_file_path: str,
         language: str = "en",
         enable_speaker_diarization: bool = True,
-        vocabulary_boost: Optional[List[str]] = None
+        vocabulary_boost: Optional[Sequence[str]] = None
     ) -> TranscriptionResult:
         """
         Transcribe an audio file and return word-level results.
@@ -38,7 +47,6 @@ class BaseTranscriptionService(ABC):
         """
         pass
     
-    @abstractmethod
     async def transcribe_segment(
         self,
         audio_file_path: str,
@@ -50,6 +58,9 @@ class BaseTranscriptionService(ABC):
         Transcribe a specific segment of an audio file.
         Used for re-transcription of uncertain segments.
         
+        The padded segment is decoded straight into memory and uploaded as
+        WAV bytes, so no temporary file is written or cleaned up.
+        
         Args:
             audio_file_path: Path to the audio file
             start_time_ms: Start time in milliseconds
@@ -59,47 +70,73 @@ class BaseTranscriptionService(ABC):
         Returns:
             TranscriptionResult for the segment
         """
-        pass
-    
-    @property
-    @abstractmethod
-    def model_name(self) -> str:
-        """Return the name/identifier of this transcription model."""
-        pass
+        clip_start_ms = max(0, start_time_ms - SEGMENT_PADDING_MS)
+        audio_data = await asyncio.to_thread(
+            extract_audio_segment_wav,
+            audio_file_path,
+            clip_start_ms,
+            end_time_ms + SEGMENT_PADDING_MS
+        )
+        
+        # Offset by where the padded clip starts, not the segment itself
+        return await self.transcribe_segment_audio(audio_data, clip_start_ms, language)
     
-    def _extract_audio_segment(
+    async def transcribe_segment_audio(
         self,
-        audio_file_path: str,
-        start_time_ms: int,
-        end_time_ms: int
-    ) -> str:
-        """
-        Extract a segment from an audio file.
-        Returns path to temporary file containing the segment.
+        audio_data: bytes,
+        offset_ms: int,
+        language: str = "en"
+    ) -> TranscriptionResult:
         """
-        from pydub import AudioSegment
-        import tempfile
-        import os
-        
-        # Load audio file
-        audio = AudioSegment.from_file(audio_file_path)
+        Transcribe an in-memory WAV clip cut from a longer recording.
         
-        # Add padding (100ms before and after for better context)
-        padding_ms = 100
-        start = max(0, start_time_ms - padding_ms)
-        end = min(len(audio), end_time_ms + padding_ms)
+        Lets the orchestrator cut a segment once and hand the same bytes to
+        every service, instead of each one re-reading the source file.
         
-        # Extract segment
-        segment = audio[start:end]
+        Args:
+            audio_data: WAV file bytes of the clip
+            offset_ms: Position of the clip's start in the original audio
+            language: ISO language code
+            
+        Returns:
+            TranscriptionResult with times relative to the original audio
+        """
+        result = await self._transcribe_wav_bytes(audio_data, language)
         
-        # Save to temporary file
-        temp_file = tempfile.NamedTemporaryFile(
-            suffix=".mp3",
-            delete=False
-        )
-        segment.export(temp_file.name, format="mp3")
+        result.words = [self._offset_word(word, offset_ms) for word in result.words]
+        return result
+    
+    @staticmethod
+    def _offset_word(word: Word, offset_ms: int) -> Word:
+        """Copy a word shifted by offset_ms, without re-running validation."""
+        return word.model_copy(update={
+            "start_time_ms": word.start_time_ms + offset_ms,
+            "end_time_ms": word.end_time_ms + offset_ms,
+        })
+    
+    @abstractmethod
+    async def _transcribe_wav_bytes(
+        self,
+        audio_data: bytes,
+        language: str
+    ) -> TranscriptionResult:
+        """
+        Transcribe WAV file bytes without speaker diarization.
         
-        return temp_file.name
+        Args:
+            audio_data: WAV file bytes
+            language: ISO language code
+            
+        Returns:
+            TranscriptionResult with times relative to the clip
+        """
+        pass
+    
+    @property
+    @abstractmethod
+    def model_name(self) -> str:
+        """Return the name/identifier of this transcription model."""
+        pass
     
     def _calculate_overall_confidence(self, words: List[Word]) -> float:
         """Calculate average confidence from word list."""
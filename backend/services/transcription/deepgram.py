@@ -1,12 +1,35 @@
 """Deepgram transcription service implementation."""
 
 import os
+from types import MappingProxyType
+import aiofiles
 import httpx
-from typing import List, Optional
+import orjson
+from typing import AsyncIterator, Optional, Sequence, Union
 
 from .base import BaseTranscriptionService
 from models.transcription import TranscriptionResult, Word
 
+# Read size when streaming an audio file into the request body; each
+# aiofiles read is a thread hand-off, so reads are kept large
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Content type sent for each audio file extension
+CONTENT_TYPES = MappingProxyType({
+    ".mp3": "audio/mp3",
+    ".wav": "audio/wav",
+    ".m4a": "audio/mp4",
+    ".ogg": "audio/ogg",
+})
+DEFAULT_CONTENT_TYPE = "audio/mp3"
+
+
+async def _read_chunks(file_path: str) -> AsyncIterator[bytes]:
+    """Yield a file's contents in upload-sized chunks."""
+    async with aiofiles.open(file_path, "rb") as f:
+        while chunk := await f.read(UPLOAD_CHUNK_SIZE):
+            yield chunk
+
 
 class DeepgramService(BaseTranscriptionService):
     """
@@ -23,6 +46,17 @@ class DeepgramService(BaseTranscriptionService):
     
     def __init__(self, api_key: str):
         super().__init__(api_key)
+        # One pooled HTTP/2 client for the service's lifetime, so each request
+        # reuses an open connection instead of a fresh TLS handshake
+        self._http_client = httpx.AsyncClient(
+            timeout=300.0,
+            http2=True,
+            headers={"Authorization": f"Token {api_key}"}
+        )
+    
+    async def aclose(self):
+        """Close the service's pooled HTTP connections."""
+        await self._http_client.aclose()
     
     @property
     def model_name(self) -> str:
@@ -33,16 +67,48 @@ class DeepgramService(BaseTranscriptionService):
         audio_file_path: str,
         language: str = "en",
         enable_speaker_diarization: bool = True,
-        vocabulary_boost: Optional[List[str]] = None
+        vocabulary_boost: Optional[Sequence[str]] = None
     ) -> TranscriptionResult:
         """Transcribe audio using Deepgram Nova-3."""
+        params = self._params(language, enable_speaker_diarization, vocabulary_boost)
         
-        # Build query parameters
+        # Determine content type
+        ext = os.path.splitext(audio_file_path)[1].lower()
+        content_type = CONTENT_TYPES.get(ext, DEFAULT_CONTENT_TYPE)
+        
+        # Stream the file into the request body rather than reading it whole
+        return await self._request(
+            params,
+            _read_chunks(audio_file_path),
+            content_type,
+            content_length=os.path.getsize(audio_file_path)
+        )
+    
+    async def _transcribe_wav_bytes(
+        self,
+        audio_data: bytes,
+        language: str
+    ) -> TranscriptionResult:
+        """Transcribe in-memory WAV audio."""
+        params = self._params(language, diarize=False)
+        return await self._request(params, audio_data, "audio/wav")
+    
+    @staticmethod
+    def _params(
+        language: str,
+        diarize: bool,
+        vocabulary_boost: Optional[Sequence[str]] = None
+    ) -> dict:
+        """
+        Build the listen endpoint's query parameters.
+        
+        Shared by whole-file and clip requests so both use the same settings.
+        """
         params = {
             "model": "nova-2",  # Using nova-2 as it's the latest stable
             "language": language,
             "punctuate": "true",
-            "diarize": str(enable_speaker_diarization).lower(),
+            "diarize": str(diarize).lower(),
             "utterances": "true",
             "smart_format": "true",
         }
@@ -51,79 +117,43 @@ class DeepgramService(BaseTranscriptionService):
         if vocabulary_boost:
             params["keywords"] = ",".join(vocabulary_boost)
         
-        # Read audio file
-        with open(audio_file_path, "rb") as f:
-            audio_data = f.read()
-        
-        # Determine content type
-        ext = os.path.splitext(audio_file_path)[1].lower()
-        content_types = {
-            ".mp3": "audio/mp3",
-            ".wav": "audio/wav",
-            ".m4a": "audio/mp4",
-            ".ogg": "audio/ogg",
-        }
-        content_type = content_types.get(ext, "audio/mp3")
-        
-        # Make API request
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            response = await client.post(
-                self.API_URL,
-                params=params,
-                content=audio_data,
-                headers={
-                    "Authorization": f"Token {self.api_key}",
-                    "Content-Type": content_type,
-                }
-            )
-            response.raise_for_status()
-            result = response.json()
-        
-        # Parse response into our format
-        return self._parse_response(result)
+        return params
     
-    async def transcribe_segment(
+    async def _request(
         self,
-        audio_file_path: str,
-        start_time_ms: int,
-        end_time_ms: int,
-        language: str = "en"
+        params: dict,
+        audio_data: Union[bytes, AsyncIterator[bytes]],
+        content_type: str,
+        content_length: Optional[int] = None
     ) -> TranscriptionResult:
-        """Transcribe a specific segment of audio."""
+        """
+        Send audio to the Deepgram API and parse the response.
+        
+        Args:
+            params: Query parameters for the listen endpoint
+            audio_data: Audio bytes, or an async iterator streaming them
+            content_type: MIME type of the audio
+            content_length: Body size in bytes when streaming, so the request
+                is sent with a length instead of chunked
+        """
+        headers = {"Content-Type": content_type}
+        if content_length is not None:
+            headers["Content-Length"] = str(content_length)
         
-        # Extract segment to temp file
-        segment_path = self._extract_audio_segment(
-            audio_file_path,
-            start_time_ms,
-            end_time_ms
+        # Make API request
+        response = await self._http_client.post(
+            self.API_URL,
+            params=params,
+            content=audio_data,
+            headers=headers
         )
+        response.raise_for_status()
+        # Word-level responses run to megabytes; orjson parses them much
+        # faster than the stdlib json behind response.json()
+        result = orjson.loads(response.content)
         
-        try:
-            # Transcribe the segment
-            result = await self.transcribe(
-                segment_path,
-                language=language,
-                enable_speaker_diarization=False
-            )
-            
-            # Adjust timestamps to be relative to original audio
-            adjusted_words = []
-            for word in result.words:
-                adjusted_words.append(Word(
-                    text=word.text,
-                    start_time_ms=word.start_time_ms + start_time_ms,
-                    end_time_ms=word.end_time_ms + start_time_ms,
-                    confidence=word.confidence,
-                    speaker=word.speaker
-                ))
-            
-            result.words = adjusted_words
-            return result
-            
-        finally:
-            # Clean up temp file
-            if os.path.exists(segment_path):
-                os.remove(segment_path)
+        # Parse response into our format
+        return self._parse_response(result)
     
     def _parse_response(self, response: dict) -> TranscriptionResult:
         """Parse Deepgram API response into TranscriptionResult."""
@@ -157,16 +187,19 @@ class DeepgramService(BaseTranscriptionService):
         
         best_alternative = alternatives[0]
         
-        # Parse words
-        words = []
-        for w in best_alternative.get("words", []):
-            words.append(Word(
+        # Parse words; a comprehension with Word bound locally keeps the
+        # per-word overhead down on long recordings
+        word = Word
+        words = [
+            word(
                 text=w.get("word", ""),
                 start_time_ms=int(w.get("start", 0) * 1000),
                 end_time_ms=int(w.get("end", 0) * 1000),
                 confidence=w.get("confidence", 0.0),
-                speaker=str(w.get("speaker")) if "speaker" in w else None
-            ))
+                speaker=str(w["speaker"]) if "speaker" in w else None
+            )
+            for w in best_alternative.get("words", ())
+        ]
         
         # Get full text and confidence
         full_text = best_alternative.get("transcript", "")
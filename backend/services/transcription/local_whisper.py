@@ -0,0 +1,133 @@
+"""Local Whisper transcription service using faster-whisper (CTranslate2)."""
+
+import asyncio
+import io
+import os
+from typing import BinaryIO, Optional, Sequence, Union
+
+from .base import BaseTranscriptionService
+from models.transcription import TranscriptionResult, Word
+
+
+class FasterWhisperService(BaseTranscriptionService):
+    """
+    Whisper run locally through faster-whisper instead of OpenAI's API.
+    
+    Features:
+    - INT8 / INT8-FP16 quantized CTranslate2 inference
+    - Word-level timestamps and per-word probabilities
+    - No network round-trip or per-request billing
+    
+    faster-whisper is an optional dependency, only needed when this backend
+    is selected (see settings.whisper_backend).
+    """
+    
+    def __init__(
+        self,
+        model_size: str = "large-v3",
+        device: str = "auto",
+        compute_type: str = "int8",
+        num_workers: int = 1
+    ):
+        """
+        Load the model once for the service's lifetime.
+        
+        Args:
+            model_size: faster-whisper model name or path to a converted model
+            device: "cpu", "cuda" or "auto"
+            compute_type: CTranslate2 quantization, e.g. "int8" on CPU or
+                "int8_float16" on GPU
+            num_workers: Transcriptions the model runs in parallel when
+                called from several threads
+        """
+        from faster_whisper import WhisperModel
+        
+        super().__init__(api_key="")
+        self.model_size = model_size
+        self.model = WhisperModel(
+            model_size,
+            device=device,
+            compute_type=compute_type,
+            num_workers=num_workers
+        )
+    
+    @property
+    def model_name(self) -> str:
+        return f"faster-whisper-{os.path.basename(self.model_size)}"
+    
+    async def transcribe(
+        self,
+        audio_file_path: str,
+        language: str = "en",
+        enable_speaker_diarization: bool = True,
+        vocabulary_boost: Optional[Sequence[str]] = None
+    ) -> TranscriptionResult:
+        """Transcribe audio with the local model."""
+        
+        # Whisper uses prompts for context/vocabulary
+        prompt = None
+        if vocabulary_boost:
+            prompt = f"Medical terms: {', '.join(vocabulary_boost)}. "
+        
+        # Inference is blocking, so it runs off the event loop
+        return await asyncio.to_thread(
+            self._transcribe_sync,
+            audio_file_path,
+            language,
+            prompt
+        )
+    
+    async def _transcribe_wav_bytes(
+        self,
+        audio_data: bytes,
+        language: str
+    ) -> TranscriptionResult:
+        """Transcribe in-memory WAV audio; the model decodes file-like input."""
+        return await asyncio.to_thread(
+            self._transcribe_sync,
+            io.BytesIO(audio_data),
+            language,
+            None
+        )
+    
+    def _transcribe_sync(
+        self,
+        audio_source: Union[str, BinaryIO],
+        language: str,
+        prompt: Optional[str]
+    ) -> TranscriptionResult:
+        """Run the model and collect its lazily generated segments."""
+        segments, info = self.model.transcribe(
+            audio_source,
+            language=language if language != "auto" else None,
+            word_timestamps=True,
+            initial_prompt=prompt
+        )
+        
+        # Segments are produced as decoding proceeds; consuming them runs it
+        segments = list(segments)
+        
+        # faster-whisper reports a probability for each word, so unlike the
+        # API there is no need to estimate confidence from avg_logprob
+        words = [
+            Word(
+                text=w.word.strip(),
+                start_time_ms=int(w.start * 1000),
+                end_time_ms=int(w.end * 1000),
+                confidence=min(max(w.probability, 0.0), 1.0),
+                speaker=None
+            )
+            for segment in segments
+            for w in (segment.words or ())
+        ]
+        
+        duration_ms = words[-1].end_time_ms if words else int(info.duration * 1000)
+        
+        return TranscriptionResult(
+            full_text=" ".join(segment.text.strip() for segment in segments).strip(),
+            words=words,
+            overall_confidence=self._calculate_overall_confidence(words),
+            duration_ms=duration_ms,
+            language=info.language or "en",
+            model_name=self.model_name
+        )
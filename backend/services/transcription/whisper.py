@@ -1,12 +1,19 @@
 """OpenAI Whisper transcription service implementation."""
 
+import asyncio
 import os
 import math
-from typing import List, Optional
+import shutil
+from bisect import bisect_right
+from itertools import chain
+from typing import Optional, Sequence
+import aiofiles
+import httpx
 from openai import AsyncOpenAI
 
 from .base import BaseTranscriptionService
 from models.transcription import TranscriptionResult, Word
+from utils.audio_utils import get_audio_duration_ms, split_audio_into_chunks
 
 
 class WhisperService(BaseTranscriptionService):
@@ -20,9 +27,46 @@ class WhisperService(BaseTranscriptionService):
     - avg_logprob for segment confidence
     """
     
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        long_audio_threshold_ms: int = 120000,
+        chunk_duration_ms: int = 60000,
+        max_concurrent_chunks: int = 4
+    ):
+        """
+        Initialize the service.
+        
+        Args:
+            api_key: OpenAI API key
+            long_audio_threshold_ms: Files longer than this are transcribed
+                by transcribe_long as concurrent chunks
+            chunk_duration_ms: Chunk length for long files
+            max_concurrent_chunks: Chunk requests in flight at once
+        """
         super().__init__(api_key)
-        self.client = AsyncOpenAI(api_key=api_key)
+        self.long_audio_threshold_ms = long_audio_threshold_ms
+        self.chunk_duration_ms = chunk_duration_ms
+        self.max_concurrent_chunks = max_concurrent_chunks
+        # One pooled HTTP/2 client for the service's lifetime, so segment and
+        # chunk requests reuse warm connections. The read timeout allows for
+        # full-size uploads being transcribed.
+        self._http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(600.0, connect=5.0),
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+            )
+        )
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            http_client=self._http_client,
+            max_retries=2
+        )
+    
+    async def aclose(self):
+        """Close the service's pooled HTTP connections."""
+        await self._http_client.aclose()
     
     @property
     def model_name(self) -> str:
@@ -33,71 +77,143 @@ class WhisperService(BaseTranscriptionService):
         audio_file_path: str,
         language: str = "en",
         enable_speaker_diarization: bool = True,
-        vocabulary_boost: Optional[List[str]] = None
+        vocabulary_boost: Optional[Sequence[str]] = None
     ) -> TranscriptionResult:
-        """Transcribe audio using OpenAI Whisper."""
+        """
+        Transcribe audio using OpenAI Whisper.
         
-        # Build prompt with vocabulary boost
-        prompt = ""
-        if vocabulary_boost:
-            # Whisper uses prompts for context/vocabulary
-            prompt = f"Medical terms: {', '.join(vocabulary_boost)}. "
-        
-        # Open audio file and transcribe
-        with open(audio_file_path, "rb") as audio_file:
-            response = await self.client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                language=language if language != "auto" else None,
-                response_format="verbose_json",
-                timestamp_granularities=["word", "segment"],
-                prompt=prompt if prompt else None
+        Recordings longer than long_audio_threshold_ms go through
+        transcribe_long; shorter ones are sent in one request.
+        """
+        duration_ms = await asyncio.to_thread(get_audio_duration_ms, audio_file_path)
+        if duration_ms > self.long_audio_threshold_ms:
+            return await self.transcribe_long(
+                audio_file_path,
+                language=language,
+                chunk_duration_ms=self.chunk_duration_ms,
+                max_concurrent_chunks=self.max_concurrent_chunks,
+                vocabulary_boost=vocabulary_boost
             )
         
-        return self._parse_response(response)
+        return await self._transcribe_file(
+            audio_file_path,
+            language,
+            self._build_prompt(vocabulary_boost)
+        )
+    
+    @staticmethod
+    def _build_prompt(vocabulary_boost: Optional[Sequence[str]]) -> str:
+        """Build the request prompt; Whisper uses prompts for context/vocabulary."""
+        if vocabulary_boost:
+            return f"Medical terms: {', '.join(vocabulary_boost)}. "
+        return ""
     
-    async def transcribe_segment(
+    async def _transcribe_file(
         self,
         audio_file_path: str,
-        start_time_ms: int,
-        end_time_ms: int,
-        language: str = "en"
+        language: str,
+        prompt: str
     ) -> TranscriptionResult:
-        """Transcribe a specific segment of audio."""
+        """Transcribe a whole file in one request."""
+        # Read the file without blocking the event loop; the API caps
+        # uploads at 25 MB, so holding it in memory is fine. The name sets
+        # the format, as for in-memory clips.
+        async with aiofiles.open(audio_file_path, "rb") as f:
+            audio_data = await f.read()
         
-        # Extract segment to temp file
-        segment_path = self._extract_audio_segment(
-            audio_file_path,
-            start_time_ms,
-            end_time_ms
+        return await self._request(
+            (os.path.basename(audio_file_path), audio_data),
+            language,
+            prompt
         )
+    
+    async def transcribe_long(
+        self,
+        audio_file_path: str,
+        language: str = "en",
+        chunk_duration_ms: int = 60000,
+        max_concurrent_chunks: int = 4,
+        vocabulary_boost: Optional[Sequence[str]] = None
+    ) -> TranscriptionResult:
+        """
+        Transcribe a long recording as fixed-length chunks sent concurrently.
         
-        try:
-            # Transcribe the segment
-            result = await self.transcribe(
-                segment_path,
-                language=language,
-                enable_speaker_diarization=False
-            )
-            
-            # Adjust timestamps to be relative to original audio
-            adjusted_words = []
-            for word in result.words:
-                adjusted_words.append(Word(
-                    text=word.text,
-                    start_time_ms=word.start_time_ms + start_time_ms,
-                    end_time_ms=word.end_time_ms + start_time_ms,
-                    confidence=word.confidence,
-                    speaker=word.speaker
-                ))
+        Wall-clock time becomes roughly that of the slowest chunk rather than
+        one request over the whole file, and each chunk stays well under the
+        API's upload size limit.
+        
+        Args:
+            audio_file_path: Path to the audio file
+            language: ISO language code
+            chunk_duration_ms: Length of each chunk in milliseconds
+            max_concurrent_chunks: Chunk requests in flight at once
+            vocabulary_boost: Terms added to every chunk's prompt
             
-            result.words = adjusted_words
+        Returns:
+            TranscriptionResult for the whole recording
+        """
+        chunks = await asyncio.to_thread(
+            split_audio_into_chunks,
+            audio_file_path,
+            chunk_duration_ms
+        )
+        semaphore = asyncio.Semaphore(max_concurrent_chunks)
+        prompt = self._build_prompt(vocabulary_boost)
+        
+        async def transcribe_chunk(chunk_path: str, start_ms: int) -> TranscriptionResult:
+            async with semaphore:
+                result = await self._transcribe_file(chunk_path, language, prompt)
+            result.words = [self._offset_word(word, start_ms) for word in result.words]
             return result
-            
+        
+        try:
+            results = await asyncio.gather(*(
+                transcribe_chunk(chunk_path, start_ms) for chunk_path, start_ms, _ in chunks
+            ))
         finally:
-            # Clean up temp file
-            if os.path.exists(segment_path):
-                os.remove(segment_path)
+            # Chunks are written together into one temporary directory
+            for chunk_dir in {os.path.dirname(chunk_path) for chunk_path, _, _ in chunks}:
+                shutil.rmtree(chunk_dir, ignore_errors=True)
+        
+        # Stitch in order; weight each chunk's confidence by its duration
+        duration_ms = chunks[-1][2] if chunks else 0
+        overall_confidence = 0.0
+        if duration_ms:
+            overall_confidence = sum(
+                result.overall_confidence * (end_ms - start_ms)
+                for result, (_, start_ms, end_ms) in zip(results, chunks)
+            ) / duration_ms
+        
+        return TranscriptionResult(
+            full_text=" ".join(result.full_text for result in results if result.full_text),
+            words=list(chain.from_iterable(result.words for result in results)),
+            overall_confidence=overall_confidence,
+            duration_ms=duration_ms,
+            language=results[0].language if results else language,
+            model_name=self.model_name
+        )
+    
+    async def _transcribe_wav_bytes(
+        self,
+        audio_data: bytes,
+        language: str
+    ) -> TranscriptionResult:
+        """Transcribe in-memory WAV audio."""
+        # The SDK takes a (filename, bytes) tuple; the name sets the format
+        return await self._request(("segment.wav", audio_data), language, "")
+    
+    async def _request(self, audio_file, language: str, prompt: str) -> TranscriptionResult:
+        """Send audio to the Whisper API and parse the response."""
+        response = await self.client.audio.transcriptions.create(
+            model="whisper-1",
+            file=audio_file,
+            language=language if language != "auto" else None,
+            response_format="verbose_json",
+            timestamp_granularities=["word", "segment"],
+            prompt=prompt if prompt else None
+        )
+        
+        return self._parse_response(response)
     
     def _parse_response(self, response) -> TranscriptionResult:
         """Parse Whisper API response into TranscriptionResult."""
@@ -105,71 +221,76 @@ class WhisperService(BaseTranscriptionService):
         # Response is a Transcription object, convert to dict for processing
         response_dict = response.model_dump() if hasattr(response, 'model_dump') else dict(response)
         
+        raw_words = response_dict.get("words") or []
+        segments = response_dict.get("segments") or []
+        
         words = []
         overall_confidence = 0.8  # Default confidence for Whisper
         
-        # Parse word-level timestamps if available
-        if "words" in response_dict and response_dict["words"]:
-            for w in response_dict["words"]:
-                # Whisper doesn't provide word-level confidence
-                # We'll use segment-level avg_logprob to estimate
-                words.append(Word(
-                    text=w.get("word", "").strip(),
-                    start_time_ms=int(w.get("start", 0) * 1000),
-                    end_time_ms=int(w.get("end", 0) * 1000),
-                    confidence=0.85,  # Default confidence
-                    speaker=None
-                ))
+        # Whisper doesn't provide word-level confidence, so it is estimated
+        # from each segment's avg_logprob, converted once per segment
+        seg_confidences = [
+            self._logprob_to_confidence(seg.get("avg_logprob", -0.5))
+            for seg in segments
+        ]
         
-        # Calculate confidence from segments if available
-        if "segments" in response_dict and response_dict["segments"]:
-            segments = response_dict["segments"]
+        # Parse word-level timestamps if available. Times and confidences are
+        # worked out as plain lists, and each Word is built once at the end.
+        if raw_words:
+            starts = [int(w.get("start", 0) * 1000) for w in raw_words]
+            ends = [int(w.get("end", 0) * 1000) for w in raw_words]
+            confidences = [0.85] * len(raw_words)  # Default confidence
             
-            # If no word-level data, create words from segments
-            if not words:
-                for seg in segments:
-                    # Create words by splitting segment text
-                    seg_text = seg.get("text", "").strip()
-                    seg_start = seg.get("start", 0)
-                    seg_end = seg.get("end", 0)
-                    
-                    # Simple word splitting with estimated timestamps
-                    seg_words = seg_text.split()
-                    if seg_words:
-                        word_duration = (seg_end - seg_start) / len(seg_words)
-                        for i, word_text in enumerate(seg_words):
-                            word_start = seg_start + (i * word_duration)
-                            word_end = word_start + word_duration
-                            
-                            # Convert avg_logprob to confidence (sigmoid-like)
-                            avg_logprob = seg.get("avg_logprob", -0.5)
-                            confidence = self._logprob_to_confidence(avg_logprob)
-                            
-                            words.append(Word(
-                                text=word_text,
-                                start_time_ms=int(word_start * 1000),
-                                end_time_ms=int(word_end * 1000),
-                                confidence=confidence,
-                                speaker=None
-                            ))
-            else:
-                # Update word confidences from segment data
-                for seg in segments:
-                    avg_logprob = seg.get("avg_logprob", -0.5)
-                    seg_start_ms = int(seg.get("start", 0) * 1000)
-                    seg_end_ms = int(seg.get("end", 0) * 1000)
-                    confidence = self._logprob_to_confidence(avg_logprob)
-                    
-                    # Update confidence for words in this segment
-                    for word in words:
-                        if word.start_time_ms >= seg_start_ms and word.end_time_ms <= seg_end_ms:
-                            word.confidence = confidence
+            if segments:
+                # Segments come in time order, so the only one that can
+                # contain a word is the last segment starting at or before it
+                seg_starts = [int(seg.get("start", 0) * 1000) for seg in segments]
+                seg_ends = [int(seg.get("end", 0) * 1000) for seg in segments]
+                
+                for i, (start, end) in enumerate(zip(starts, ends)):
+                    idx = bisect_right(seg_starts, start) - 1
+                    if idx >= 0 and end <= seg_ends[idx]:
+                        confidences[i] = seg_confidences[idx]
             
-            # Calculate overall confidence from segment avg_logprobs
-            avg_logprobs = [s.get("avg_logprob", -0.5) for s in segments]
-            if avg_logprobs:
-                avg_logprob = sum(avg_logprobs) / len(avg_logprobs)
-                overall_confidence = self._logprob_to_confidence(avg_logprob)
+            words = [
+                Word(
+                    text=w.get("word", "").strip(),
+                    start_time_ms=start,
+                    end_time_ms=end,
+                    confidence=confidence,
+                    speaker=None
+                )
+                for w, start, end, confidence in zip(raw_words, starts, ends, confidences)
+            ]
+        
+        # If no word-level data, create words from segments
+        elif segments:
+            for seg, confidence in zip(segments, seg_confidences):
+                # Create words by splitting segment text
+                seg_text = seg.get("text", "").strip()
+                seg_start = seg.get("start", 0)
+                seg_end = seg.get("end", 0)
+                
+                # Simple word splitting with estimated timestamps
+                seg_words = seg_text.split()
+                if seg_words:
+                    word_duration = (seg_end - seg_start) / len(seg_words)
+                    for i, word_text in enumerate(seg_words):
+                        word_start = seg_start + (i * word_duration)
+                        word_end = word_start + word_duration
+                        
+                        words.append(Word(
+                            text=word_text,
+                            start_time_ms=int(word_start * 1000),
+                            end_time_ms=int(word_end * 1000),
+                            confidence=confidence,
+                            speaker=None
+                        ))
+        
+        # Calculate overall confidence from segment avg_logprobs
+        if segments:
+            avg_logprob = sum(s.get("avg_logprob", -0.5) for s in segments) / len(segments)
+            overall_confidence = self._logprob_to_confidence(avg_logprob)
         
         # Calculate overall confidence from words
         if words:
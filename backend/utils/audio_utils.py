@@ -1,10 +1,79 @@
 """Audio manipulation utilities."""
 
+import audioop
+import json
+import math
+import mmap
 import os
+import struct
+import subprocess
 import tempfile
-from typing import Tuple
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Optional, Tuple
+import webrtcvad
 from pydub import AudioSegment
 
+# Format of the decoded PCM cache: 16 kHz mono signed 16-bit little-endian
+PCM_SAMPLE_RATE = 16000
+PCM_SAMPLE_WIDTH = 2
+PCM_BYTES_PER_MS = PCM_SAMPLE_RATE * PCM_SAMPLE_WIDTH // 1000
+
+# Media type served for each supported upload extension
+AUDIO_CONTENT_TYPES = MappingProxyType({
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/wav",
+    ".m4a": "audio/mp4",
+    ".ogg": "audio/ogg",
+})
+DEFAULT_AUDIO_CONTENT_TYPE = "audio/mpeg"
+
+# Frame length for voice activity detection; webrtcvad takes 10, 20 or 30 ms
+VAD_FRAME_MS = 30
+
+# Decoded bytes read per step when measuring a file's level
+LEVEL_BLOCK_SIZE = 1 << 20
+
+
+@lru_cache(maxsize=256)
+def _probe_at(file_path: str, mtime_ns: int, size: int) -> dict:
+    """Probe one version of a file; the stat fields make a rewrite a new key."""
+    completed = subprocess.run(
+        [
+            "ffprobe", "-v", "error",
+            "-select_streams", "a:0",
+            "-show_entries", "format=duration:stream=codec_name,sample_rate,channels,bits_per_sample",
+            "-of", "json", file_path,
+        ],
+        check=True,
+        capture_output=True
+    )
+    probe = json.loads(completed.stdout)
+    streams = probe.get("streams") or [{}]
+    return {"format": probe.get("format", {}), "stream": streams[0]}
+
+
+def _probe(file_path: str) -> dict:
+    """
+    Read an audio file's container and first audio stream metadata.
+    
+    ffprobe only parses headers, so nothing is decoded. Memoized while the
+    file is unchanged; treat the result as read-only.
+    
+    Args:
+        file_path: Path to the audio file
+        
+    Returns:
+        Dict with "format" and "stream" entries from ffprobe
+    """
+    stat = os.stat(file_path)
+    return _probe_at(file_path, stat.st_mtime_ns, stat.st_size)
+
+
+def _probe_duration_ms(probe: dict) -> int:
+    """Duration in milliseconds from _probe output."""
+    return round(float(probe["format"].get("duration", 0)) * 1000)
+
 
 def get_audio_duration_ms(file_path: str) -> int:
     """
@@ -16,45 +85,53 @@ def get_audio_duration_ms(file_path: str) -> int:
     Returns:
         Duration in milliseconds
     """
-    audio = AudioSegment.from_file(file_path)
-    return len(audio)
+    return _probe_duration_ms(_probe(file_path))
 
 
-def extract_audio_segment(
-    file_path: str,
-    start_ms: int,
-    end_ms: int,
-    padding_ms: int = 100
-) -> str:
+def get_audio_codec(file_path: str) -> Optional[str]:
     """
-    Extract a segment from an audio file.
+    Get the codec name of an audio file's first audio stream.
     
     Args:
-        file_path: Path to the source audio file
-        start_ms: Start time in milliseconds
-        end_ms: End time in milliseconds
-        padding_ms: Padding to add before/after for context
+        file_path: Path to the audio file
         
     Returns:
-        Path to temporary file containing the segment
+        ffprobe codec name (e.g. "aac", "alac"), or None if it can't be probed
     """
-    audio = AudioSegment.from_file(file_path)
-    
-    # Apply padding
-    padded_start = max(0, start_ms - padding_ms)
-    padded_end = min(len(audio), end_ms + padding_ms)
+    try:
+        return _probe(file_path)["stream"].get("codec_name")
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return None
+
+
+def extract_audio_segment_wav(file_path: str, start_ms: int, end_ms: int) -> bytes:
+    """
+    Decode a time window of an audio file into WAV bytes held in memory.
     
-    # Extract segment
-    segment = audio[padded_start:padded_end]
+    ffmpeg seeks in the input and writes raw PCM to its stdout, which is
+    wrapped in a WAV header here, so nothing is written to disk.
     
-    # Save to temporary file
-    temp_file = tempfile.NamedTemporaryFile(
-        suffix=".mp3",
-        delete=False
+    Args:
+        file_path: Path to the source audio file
+        start_ms: Start time in milliseconds
+        end_ms: End time in milliseconds (ffmpeg stops at the end of the input)
+        
+    Returns:
+        WAV file bytes in the decoded cache format
+    """
+    completed = subprocess.run(
+        [
+            "ffmpeg", "-nostdin", "-v", "error",
+            "-ss", f"{start_ms / 1000:.3f}",
+            "-t", f"{(end_ms - start_ms) / 1000:.3f}",
+            "-i", file_path,
+            "-vn", "-ac", "1", "-ar", str(PCM_SAMPLE_RATE),
+            "-f", "s16le", "pipe:1",
+        ],
+        check=True,
+        capture_output=True
     )
-    segment.export(temp_file.name, format="mp3")
-    
-    return temp_file.name
+    return pcm_wav_header(len(completed.stdout)) + completed.stdout
 
 
 def convert_to_mp3(file_path: str) -> str:
@@ -88,14 +165,19 @@ def get_audio_info(file_path: str) -> dict:
     Returns:
         Dictionary with audio info
     """
-    audio = AudioSegment.from_file(file_path)
+    probe = _probe(file_path)
+    stream = probe["stream"]
+    duration_ms = _probe_duration_ms(probe)
+    
+    # Compressed formats report no bit depth; they decode to 16-bit
+    bits_per_sample = int(stream.get("bits_per_sample") or 0) or 16
     
     return {
-        "duration_ms": len(audio),
-        "duration_seconds": len(audio) / 1000,
-        "channels": audio.channels,
-        "sample_rate": audio.frame_rate,
-        "sample_width": audio.sample_width,
+        "duration_ms": duration_ms,
+        "duration_seconds": duration_ms / 1000,
+        "channels": int(stream.get("channels", 0)),
+        "sample_rate": int(stream.get("sample_rate", 0)),
+        "sample_width": bits_per_sample // 8,
     }
 
 
@@ -110,22 +192,76 @@ def normalize_audio(file_path: str, target_dbfs: float = -20.0) -> str:
     Returns:
         Path to normalized audio file
     """
-    audio = AudioSegment.from_file(file_path)
+    # Calculate the change needed; silence has no level to scale from
+    current_dbfs = _measure_dbfs(file_path)
+    change_in_dbfs = target_dbfs - current_dbfs if math.isfinite(current_dbfs) else 0.0
     
-    # Calculate the change needed
-    change_in_dbfs = target_dbfs - audio.dBFS
+    # Apply gain while re-encoding, without holding the audio in memory
+    fd, output_path = tempfile.mkstemp(suffix=".mp3")
+    os.close(fd)
     
-    # Apply gain
-    normalized = audio + change_in_dbfs
+    subprocess.run(
+        [
+            "ffmpeg", "-nostdin", "-v", "error", "-y",
+            "-i", file_path,
+            "-vn", "-af", f"volume={change_in_dbfs:.3f}dB",
+            output_path,
+        ],
+        check=True,
+        capture_output=True
+    )
+    
+    return output_path
+
+
+def _measure_dbfs(file_path: str) -> float:
+    """
+    Measure an audio file's RMS level in dBFS, as pydub's dBFS does.
+    
+    ffmpeg decodes to 16-bit PCM at the native rate and channel count, and
+    the RMS is accumulated block by block with audioop, so the decoded audio
+    is never held in memory at once.
     
-    # Save to temporary file
-    temp_file = tempfile.NamedTemporaryFile(
-        suffix=".mp3",
-        delete=False
+    Args:
+        file_path: Path to the audio file
+        
+    Returns:
+        Level in dBFS; -inf for digital silence
+    """
+    process = subprocess.Popen(
+        [
+            "ffmpeg", "-nostdin", "-v", "error",
+            "-i", file_path,
+            "-vn", "-f", "s16le", "pipe:1",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL
     )
-    normalized.export(temp_file.name, format="mp3")
     
-    return temp_file.name
+    sum_squares = 0
+    sample_count = 0
+    leftover = b""
+    with process.stdout:
+        while block := process.stdout.read(LEVEL_BLOCK_SIZE):
+            # Pipe reads can split a sample; carry the odd byte over
+            block = leftover + block
+            usable = len(block) - len(block) % PCM_SAMPLE_WIDTH
+            leftover = block[usable:]
+            
+            samples = usable // PCM_SAMPLE_WIDTH
+            if samples:
+                rms = audioop.rms(block[:usable], PCM_SAMPLE_WIDTH)
+                sum_squares += rms * rms * samples
+                sample_count += samples
+    
+    if process.wait() != 0:
+        raise subprocess.CalledProcessError(process.returncode, "ffmpeg")
+    
+    if not sum_squares:
+        return float("-inf")
+    
+    rms = math.sqrt(sum_squares / sample_count)
+    return 20 * math.log10(rms / (1 << (8 * PCM_SAMPLE_WIDTH - 1)))
 
 
 def split_audio_into_chunks(
@@ -135,6 +271,10 @@ def split_audio_into_chunks(
     """
     Split a long audio file into smaller chunks.
     
+    One ffmpeg pass decodes the file and writes every chunk as a WAV in the
+    decoded cache format, instead of decoding it into memory and encoding
+    each chunk separately.
+    
     Args:
         file_path: Path to the source audio file
         chunk_duration_ms: Duration of each chunk in milliseconds
@@ -142,25 +282,132 @@ def split_audio_into_chunks(
     Returns:
         List of tuples (chunk_path, start_ms, end_ms)
     """
-    audio = AudioSegment.from_file(file_path)
-    total_duration = len(audio)
+    total_duration = get_audio_duration_ms(file_path)
     
-    chunks = []
-    start_ms = 0
+    chunk_dir = tempfile.mkdtemp()
+    subprocess.run(
+        [
+            "ffmpeg", "-nostdin", "-v", "error", "-y",
+            "-i", file_path,
+            "-vn", "-ac", "1", "-ar", str(PCM_SAMPLE_RATE),
+            "-f", "segment", "-segment_time", f"{chunk_duration_ms / 1000:.3f}",
+            os.path.join(chunk_dir, "chunk_%05d.wav"),
+        ],
+        check=True,
+        capture_output=True
+    )
     
-    while start_ms < total_duration:
+    chunks = []
+    for index, name in enumerate(sorted(os.listdir(chunk_dir))):
+        start_ms = index * chunk_duration_ms
         end_ms = min(start_ms + chunk_duration_ms, total_duration)
-        chunk = audio[start_ms:end_ms]
+        chunks.append((os.path.join(chunk_dir, name), start_ms, end_ms))
+    
+    return chunks
+
+
+def decode_to_pcm(file_path: str, output_path: str) -> None:
+    """
+    Decode an audio file once into a raw PCM file for fast slicing.
+    
+    The output is 16 kHz mono signed 16-bit little-endian, so a millisecond
+    offset maps directly to a byte offset (see PCM_BYTES_PER_MS).
+    
+    Args:
+        file_path: Path to the source audio file
+        output_path: Path to write the raw PCM to
+    """
+    subprocess.run(
+        [
+            "ffmpeg", "-nostdin", "-v", "error", "-y",
+            "-i", file_path,
+            "-vn", "-ac", "1", "-ar", str(PCM_SAMPLE_RATE),
+            "-f", "s16le", output_path,
+        ],
+        check=True,
+        capture_output=True
+    )
+
+
+def map_pcm(pcm_path: str) -> Optional[mmap.mmap]:
+    """
+    Memory-map a decoded PCM file read-only.
+    
+    Slicing the map reads only the pages a clip covers, and the pages stay
+    in the OS page cache for the next reader.
+    
+    Args:
+        pcm_path: Path to PCM written by decode_to_pcm
+        
+    Returns:
+        The map, or None if the file is empty (which mmap cannot map)
+    """
+    with open(pcm_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def pcm_wav_clip(pcm: bytes, start_ms: int, end_ms: int) -> bytes:
+    """
+    Cut a time window out of decoded PCM as a complete WAV file.
+    
+    Args:
+        pcm: PCM in the decoded cache format, as bytes or a map_pcm map
+        start_ms: Clip start in milliseconds
+        end_ms: Clip end in milliseconds (clamped to the audio length)
         
-        # Save chunk to temporary file
-        temp_file = tempfile.NamedTemporaryFile(
-            suffix=".mp3",
-            delete=False
-        )
-        chunk.export(temp_file.name, format="mp3")
+    Returns:
+        WAV file bytes
+    """
+    data = pcm[start_ms * PCM_BYTES_PER_MS:end_ms * PCM_BYTES_PER_MS]
+    return pcm_wav_header(len(data)) + data
+
+
+def voiced_ratio(pcm: bytes, start_ms: int, end_ms: int, aggressiveness: int = 2) -> float:
+    """
+    Measure the fraction of a time window that contains speech.
+    
+    Args:
+        pcm: PCM in the decoded cache format, as bytes or a map_pcm map
+        start_ms: Window start in milliseconds
+        end_ms: Window end in milliseconds
+        aggressiveness: webrtcvad mode, 0 (least) to 3 (most eager to call
+            audio non-speech)
         
-        chunks.append((temp_file.name, start_ms, end_ms))
-        start_ms = end_ms
+    Returns:
+        Fraction (0-1) of VAD frames judged voiced; 1.0 if the window is
+        shorter than one frame, since there is too little audio to tell
+    """
+    vad = webrtcvad.Vad(aggressiveness)
+    frame_size = VAD_FRAME_MS * PCM_BYTES_PER_MS
+    data = pcm[start_ms * PCM_BYTES_PER_MS:end_ms * PCM_BYTES_PER_MS]
     
-    return chunks
+    offsets = range(0, len(data) - frame_size + 1, frame_size)
+    if not offsets:
+        return 1.0
+    
+    voiced = sum(
+        vad.is_speech(data[offset:offset + frame_size], PCM_SAMPLE_RATE)
+        for offset in offsets
+    )
+    return voiced / len(offsets)
+
 
+def pcm_wav_header(data_size: int) -> bytes:
+    """
+    Build a WAV header for raw PCM in the decoded cache format.
+    
+    Args:
+        data_size: Number of PCM bytes that follow the header
+        
+    Returns:
+        44-byte RIFF/WAVE header
+    """
+    byte_rate = PCM_SAMPLE_RATE * PCM_SAMPLE_WIDTH
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, 1, PCM_SAMPLE_RATE, byte_rate, PCM_SAMPLE_WIDTH, PCM_SAMPLE_WIDTH * 8,
+        b"data", data_size
+    )
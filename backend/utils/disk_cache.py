@@ -0,0 +1,66 @@
+"""On-disk response cache shared by the API clients."""
+
+import logging
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+import aiofiles
+import aiofiles.os
+
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    """
+    Content-addressed on-disk cache of API responses.
+    
+    Stores response text, one file per key, so repeating a request whose
+    inputs hash to the same key skips the API call entirely. Used for judge
+    verdicts and for segment transcriptions.
+    """
+    
+    def __init__(self, cache_dir: str, ttl_seconds: int = 7 * 24 * 3600):
+        """
+        Initialize the cache.
+        
+        Args:
+            cache_dir: Directory holding cached responses
+            ttl_seconds: How long an entry stays valid after being written
+        """
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+    
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached response text for a key, or None if missing or expired."""
+        path = self._path(key)
+        try:
+            stat = await aiofiles.os.stat(path)
+            if time.time() - stat.st_mtime > self.ttl_seconds:
+                return None
+            async with aiofiles.open(path, "r", encoding="utf-8") as f:
+                return await f.read()
+        except OSError:
+            return None
+    
+    async def set(self, key: str, response_text: str):
+        """Store a response; written to a temp file first so readers never see a partial entry."""
+        path = self._path(key)
+        # Unique per write: concurrent writers of one key, in this process or
+        # another, each replace the entry with their own complete file
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            async with aiofiles.open(tmp_path, "w", encoding="utf-8") as f:
+                await f.write(response_text)
+            await aiofiles.os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Failed to write cache entry in %s: %s", self.cache_dir, e)
+            try:
+                await aiofiles.os.remove(tmp_path)
+            except OSError:
+                pass
@@ -1,7 +1,31 @@
 """Text processing utilities."""
 
 import re
-from typing import List
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Tuple
+
+# Patterns used on every call, compiled once
+# Every cleanup rule in one alternation, so the text is scanned once:
+# whitespace before punctuation is dropped, punctuation before a capital gets
+# exactly one space, and any other whitespace run becomes one space. A lone
+# space already matches that and is left alone.
+_CLEANUP_REGEX = re.compile(
+    r'(?P<drop>\s+(?=[.,!?;:]))'
+    r'|(?P<punct>[.,!?;:])\s*(?=[A-Z])'
+    r'|\s\s+|[^\S ]'
+)
+_SENTENCE_SPLIT_REGEX = re.compile(r'(?<=[.!?])\s+')
+_NUMBER_REGEX = re.compile(
+    r'(\d+\.?\d*)\s*(%|mg|ml|bpm|mmHg|lbs?|kg|units?|mcg)?',
+    re.IGNORECASE
+)
+
+
+def _cleanup_replacement(match: re.Match) -> str:
+    """Replacement for a _CLEANUP_REGEX match."""
+    if match.lastgroup == 'punct':
+        return match.group('punct') + ' '
+    return '' if match.lastgroup == 'drop' else ' '
 
 
 def clean_transcription_text(text: str) -> str:
@@ -14,12 +38,8 @@ def clean_transcription_text(text: str) -> str:
     Returns:
         Cleaned text
     """
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Fix common punctuation issues
-    text = re.sub(r'\s+([.,!?;:])', r'\1', text)
-    text = re.sub(r'([.,!?;:])\s*([A-Z])', r'\1 \2', text)
+    # Remove extra whitespace and fix common punctuation issues
+    text = _CLEANUP_REGEX.sub(_cleanup_replacement, text)
     
     # Capitalize first letter
     if text:
@@ -39,7 +59,7 @@ def split_into_sentences(text: str) -> List[str]:
         List of sentences
     """
     # Split on sentence-ending punctuation
-    sentences = re.split(r'(?<=[.!?])\s+', text)
+    sentences = _SENTENCE_SPLIT_REGEX.split(text)
     return [s.strip() for s in sentences if s.strip()]
 
 
@@ -53,24 +73,40 @@ def extract_numbers(text: str) -> List[dict]:
     Returns:
         List of dictionaries with number info
     """
-    numbers = []
-    
-    # Pattern for numbers with optional decimals
-    pattern = r'(\d+\.?\d*)\s*(%|mg|ml|bpm|mmHg|lbs?|kg|units?|mcg)?'
-    
-    matches = re.finditer(pattern, text, re.IGNORECASE)
-    for match in matches:
-        value = match.group(1)
-        unit = match.group(2) if match.group(2) else None
-        
-        numbers.append({
+    # Numbers with optional decimals and unit; an absent unit is None
+    return [
+        {
             "value": value,
             "unit": unit,
             "position": match.start(),
-            "raw_text": match.group(0)
-        })
+            "raw_text": match.group()
+        }
+        for match in _NUMBER_REGEX.finditer(text)
+        for value, unit in (match.groups(),)
+    ]
+
+
+@lru_cache(maxsize=32)
+def _terms_matcher(terms: Tuple[str, ...]) -> Tuple[re.Pattern, Dict[str, FrozenSet[str]]]:
+    """
+    Compile a vocabulary into one regex that finds every term in one scan.
+    
+    The alternation sits in a lookahead and lists longer terms first, so at
+    each position it reports the longest term starting there. Any shorter
+    term found at that position is a substring of it, so each term maps to
+    every term it contains.
     
-    return numbers
+    Returns:
+        Tuple of (combined regex over lower-cased terms,
+        lower-cased term -> lower-cased terms it contains)
+    """
+    lowered = sorted({term.lower() for term in terms}, key=len, reverse=True)
+    pattern = re.compile(f"(?=({'|'.join(map(re.escape, lowered))}))")
+    contained = {
+        term: frozenset(other for other in lowered if other in term)
+        for term in lowered
+    }
+    return pattern, contained
 
 
 def find_medical_terms(text: str, terms_list: List[str]) -> List[str]:
@@ -84,20 +120,42 @@ def find_medical_terms(text: str, terms_list: List[str]) -> List[str]:
     Returns:
         List of found terms
     """
-    text_lower = text.lower()
-    found = []
+    if not terms_list:
+        return []
+    
+    pattern, contained = _terms_matcher(tuple(terms_list))
+    
+    present = set()
+    for hit in set(pattern.findall(text.lower())):
+        present |= contained[hit]
+    
+    return [term for term in terms_list if term.lower() in present]
+
+
+@lru_cache(maxsize=32)
+def _keywords_matcher(keywords: Tuple[str, ...]) -> Tuple[re.Pattern, Dict[str, str]]:
+    """
+    Compile keywords into one case-insensitive regex, longest first.
     
-    for term in terms_list:
-        if term.lower() in text_lower:
-            found.append(term)
+    Returns:
+        Tuple of (combined regex, lower-cased keyword -> keyword as listed)
+    """
+    replacements = {}
+    for keyword in keywords:
+        if keyword:
+            replacements.setdefault(keyword.lower(), keyword)
     
-    return found
+    alternation = "|".join(map(re.escape, sorted(replacements, key=len, reverse=True)))
+    return re.compile(alternation, re.IGNORECASE), replacements
 
 
 def highlight_keywords(text: str, keywords: List[str]) -> str:
     """
     Add markdown highlighting to keywords in text.
     
+    All keywords are matched in one pass, so where keywords overlap the
+    longest one is highlighted once rather than nesting highlights.
+    
     Args:
         text: Input text
         keywords: Keywords to highlight
@@ -105,11 +163,14 @@ def highlight_keywords(text: str, keywords: List[str]) -> str:
     Returns:
         Text with highlighted keywords
     """
-    for keyword in keywords:
-        pattern = re.compile(re.escape(keyword), re.IGNORECASE)
-        text = pattern.sub(f'**{keyword}**', text)
+    pattern, replacements = _keywords_matcher(tuple(keywords))
+    if not replacements:
+        return text
     
-    return text
+    return pattern.sub(
+        lambda match: f"**{replacements.get(match.group(0).lower(), match.group(0))}**",
+        text
+    )
 
 
 def truncate_text(text: str, max_length: int = 100, suffix: str = "...") -> str:
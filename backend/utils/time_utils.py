@@ -1,7 +1,21 @@
 """Timestamp conversion utilities."""
 
+import re
+from itertools import islice
 from typing import Tuple
 
+# [HH:]MM:SS[.mmm]; the fraction is taken as a whole number of milliseconds.
+# As with the old split-and-int() parser, whitespace around any field is
+# allowed and anything after a second "." is ignored.
+_CLOCK_TIME_REGEX = re.compile(
+    r'(?:\s*(\d+)\s*:)?\s*(\d+)\s*:\s*(\d+)\s*(?:\.\s*(\d+)\s*(?:\.[^:]*)?)?'
+)
+
+# Zero-padded fields, indexed by value. divmod keeps minutes and seconds in
+# [0, 60) and milliseconds in [0, 1000), so lookups replace format specs.
+_TWO_DIGITS = tuple(f"{i:02d}" for i in range(60))
+_THREE_DIGITS = tuple(f"{i:03d}" for i in range(1000))
+
 
 def ms_to_seconds(ms: int) -> float:
     """Convert milliseconds to seconds."""
@@ -23,10 +37,8 @@ def ms_to_time_string(ms: int) -> str:
     Returns:
         Formatted time string
     """
-    total_seconds = ms // 1000
-    minutes = total_seconds // 60
-    seconds = total_seconds % 60
-    return f"{minutes}:{seconds:02d}"
+    minutes, seconds = divmod(ms // 1000, 60)
+    return f"{minutes}:{_TWO_DIGITS[seconds]}"
 
 
 def ms_to_full_time_string(ms: int) -> str:
@@ -39,14 +51,13 @@ def ms_to_full_time_string(ms: int) -> str:
     Returns:
         Formatted time string
     """
-    hours = ms // 3600000
-    minutes = (ms % 3600000) // 60000
-    seconds = (ms % 60000) // 1000
-    milliseconds = ms % 1000
+    hours, remainder = divmod(ms, 3600000)
+    minutes, remainder = divmod(remainder, 60000)
+    seconds, milliseconds = divmod(remainder, 1000)
     
     if hours > 0:
-        return f"{hours}:{minutes:02d}:{seconds:02d}.{milliseconds:03d}"
-    return f"{minutes}:{seconds:02d}.{milliseconds:03d}"
+        return f"{hours}:{_TWO_DIGITS[minutes]}:{_TWO_DIGITS[seconds]}.{_THREE_DIGITS[milliseconds]}"
+    return f"{minutes}:{_TWO_DIGITS[seconds]}.{_THREE_DIGITS[milliseconds]}"
 
 
 def parse_time_string(time_str: str) -> int:
@@ -65,33 +76,17 @@ def parse_time_string(time_str: str) -> int:
     Returns:
         Time in milliseconds
     """
-    parts = time_str.split(':')
-    
-    if len(parts) == 1:
+    if ':' not in time_str:
         # Just seconds (possibly with milliseconds)
-        seconds = float(parts[0])
-        return int(seconds * 1000)
-    
-    elif len(parts) == 2:
-        # MM:SS or MM:SS.mmm
-        minutes = int(parts[0])
-        seconds_parts = parts[1].split('.')
-        seconds = int(seconds_parts[0])
-        ms = int(seconds_parts[1]) if len(seconds_parts) > 1 else 0
-        
-        return (minutes * 60 + seconds) * 1000 + ms
+        return int(float(time_str) * 1000)
     
-    elif len(parts) == 3:
-        # HH:MM:SS or HH:MM:SS.mmm
-        hours = int(parts[0])
-        minutes = int(parts[1])
-        seconds_parts = parts[2].split('.')
-        seconds = int(seconds_parts[0])
-        ms = int(seconds_parts[1]) if len(seconds_parts) > 1 else 0
-        
-        return (hours * 3600 + minutes * 60 + seconds) * 1000 + ms
+    # MM:SS, HH:MM:SS, either with .mmm
+    match = _CLOCK_TIME_REGEX.fullmatch(time_str)
+    if match is None:
+        raise ValueError(f"Invalid time string format: {time_str}")
     
-    raise ValueError(f"Invalid time string format: {time_str}")
+    hours, minutes, seconds, ms = match.groups()
+    return (int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds)) * 1000 + int(ms or 0)
 
 
 def get_time_range_string(start_ms: int, end_ms: int) -> str:
@@ -148,20 +143,23 @@ def merge_time_ranges(ranges: list[Tuple[int, int]]) -> list[Tuple[int, int]]:
     if not ranges:
         return []
     
-    # Sort by start time
-    sorted_ranges = sorted(ranges, key=lambda x: x[0])
+    # Tuples sort by start first; ranges sharing a start always merge, so
+    # the tie order on end does not change the result
+    sorted_ranges = sorted(ranges)
     
-    merged = [sorted_ranges[0]]
+    # Carry the open range as two locals instead of rebuilding a tuple on
+    # every merge
+    merged = []
+    start, end = sorted_ranges[0]
     
-    for current in sorted_ranges[1:]:
-        last = merged[-1]
-        
+    for next_start, next_end in islice(sorted_ranges, 1, None):
         # Check if ranges overlap or are adjacent
-        if current[0] <= last[1]:
-            # Merge
-            merged[-1] = (last[0], max(last[1], current[1]))
+        if next_start <= end:
+            if next_end > end:
+                end = next_end
         else:
-            merged.append(current)
+            merged.append((start, end))
+            start, end = next_start, next_end
     
+    merged.append((start, end))
     return merged
-
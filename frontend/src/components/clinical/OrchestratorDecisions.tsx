@@ -18,6 +18,7 @@ const SOURCE_LABELS: Record<string, { label: string; color: string }> = {
   assemblyai: { label: 'AssemblyAI', color: 'bg-green-100 text-green-700' },
   whisper: { label: 'Whisper', color: 'bg-orange-100 text-orange-700' },
   synthesized: { label: 'Synthesized', color: 'bg-purple-100 text-purple-700' },
+  silence: { label: 'Silence', color: 'bg-gray-100 text-gray-700' },
 };
 
 export function OrchestratorDecisions({ decisions }: OrchestratorDecisionsProps) {
@@ -44,7 +44,7 @@ export interface CandidateTranscription {
 export interface OrchestratorDecision {
   segment: UncertainSegment;
   candidate_transcriptions: Record<string, CandidateTranscription>;
-  chosen_source: 'deepgram' | 'assemblyai' | 'whisper' | 'synthesized';
+  chosen_source: 'deepgram' | 'assemblyai' | 'whisper' | 'synthesized' | 'silence';
   final_text: string;
   reasoning: string;
   confidence_boost: number;